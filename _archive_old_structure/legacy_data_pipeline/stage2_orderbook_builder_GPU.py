@@ -11,6 +11,7 @@ import cudf
 import cupy as cp
 import pandas as pd
 from datetime import datetime, timezone
+import heapq
 from collections import defaultdict
 from pathlib import Path
 import os
@@ -102,9 +103,9 @@ class OrderBookGPU:
         if not self.bids or not self.asks:
             return None
         
-        # Sort and get top 10 levels
-        top_bids = sorted(self.bids.items(), reverse=True)[:10]
-        top_asks = sorted(self.asks.items())[:10]
+        # Top 10 levels via a bounded heap (O(N log 10), no full sort)
+        top_bids = heapq.nlargest(10, self.bids.items())
+        top_asks = heapq.nsmallest(10, self.asks.items())
         
         best_bid = top_bids[0][0]
         best_ask = top_asks[0][0]
@@ -2,81 +2,330 @@
 """
 Transform raw JSONL data into ML-ready features
 """
-import json
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
 from datetime import datetime
 from collections import defaultdict
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernel below still defines without numba."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+SNAPSHOT_FEATURES = [
+    'best_bid', 'best_ask', 'mid_price', 'spread', 'spread_pct',
+    'bid_volume_10', 'ask_volume_10', 'order_imbalance',
+    'depth_bid_0.1pct', 'depth_ask_0.1pct',
+]
+
+
+class BookSide:
+    """
+    One side of an order book as parallel sorted price/qty arrays (SoA).
+    
+    Levels are kept sorted best-first (bids descending, asks ascending) in
+    over-allocated NumPy buffers, so the top of book is a slice and depth
+    features are vectorized reductions instead of a full dict sort.
+    """
+    
+    def __init__(self, descending, capacity=256):
+        # Keys are sign * price so both sides search an ascending array
+        self.sign = -1.0 if descending else 1.0
+        self.keys = np.empty(capacity, dtype=np.float64)
+        self.qtys = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+    
+    def update(self, price, qty):
+        """Set the quantity at a price level (qty == 0 removes the level)."""
+        key = self.sign * price
+        n = self.size
+        i = int(np.searchsorted(self.keys[:n], key))
+        found = i < n and self.keys[i] == key
+        
+        if qty == 0:
+            if found:
+                self.keys[i:n - 1] = self.keys[i + 1:n]
+                self.qtys[i:n - 1] = self.qtys[i + 1:n]
+                self.size = n - 1
+        elif found:
+            self.qtys[i] = qty
+        else:
+            if n == len(self.keys):
+                self.keys = np.resize(self.keys, 2 * n)
+                self.qtys = np.resize(self.qtys, 2 * n)
+            self.keys[i + 1:n + 1] = self.keys[i:n]
+            self.qtys[i + 1:n + 1] = self.qtys[i:n]
+            self.keys[i] = key
+            self.qtys[i] = qty
+            self.size = n + 1
+    
+    def top(self, depth=10):
+        """Return (prices, qtys) of the best `depth` levels, best first."""
+        k = min(depth, self.size)
+        return self.sign * self.keys[:k], self.qtys[:k]
+
+
+@njit(cache=True)
+def _book_update(keys, qtys, sizes, p, key, qty):
+    """Apply one level update to row p of a fixed-capacity sorted book side."""
+    n = sizes[p]
+    i = np.searchsorted(keys[p, :n], key)
+    found = i < n and keys[p, i] == key
+    
+    if qty == 0.0:
+        if found:
+            keys[p, i:n - 1] = keys[p, i + 1:n].copy()
+            qtys[p, i:n - 1] = qtys[p, i + 1:n].copy()
+            sizes[p] = n - 1
+    elif found:
+        qtys[p, i] = qty
+    else:
+        keys[p, i + 1:n + 1] = keys[p, i:n].copy()
+        qtys[p, i + 1:n + 1] = qtys[p, i:n].copy()
+        keys[p, i] = key
+        qtys[p, i] = qty
+        sizes[p] = n + 1
+
+
+@njit(cache=True)
+def _grow(arr):
+    out = np.empty((arr.shape[0], 2 * arr.shape[1]), dtype=arr.dtype)
+    out[:, :arr.shape[1]] = arr
+    return out
 
-class FeatureEngineer:    def __init__(self, level2_file, ticker_file, snapshot_interval_seconds=10):
+
+@njit(cache=True)
+def _process_level2_updates(is_update, product_codes, times, offsets, prices,
+                            qtys, is_bid, n_products, interval_ns, capacity=256):
+    """
+    Run the order book state machine and snapshot sampling in native code.
+    
+    Bids are stored as negated prices so both sides are ascending arrays;
+    each product owns one row of the (n_products, capacity) buffers.
+    
+    Returns:
+        (event_idx, features): index of the event each snapshot was taken at,
+        and a (n_snapshots, 10) array in SNAPSHOT_FEATURES order
+    """
+    n_events = len(product_codes)
+    bid_keys = np.empty((n_products, capacity), dtype=np.float64)
+    bid_qtys = np.empty((n_products, capacity), dtype=np.float64)
+    ask_keys = np.empty((n_products, capacity), dtype=np.float64)
+    ask_qtys = np.empty((n_products, capacity), dtype=np.float64)
+    bid_sizes = np.zeros(n_products, dtype=np.int64)
+    ask_sizes = np.zeros(n_products, dtype=np.int64)
+    last_time = np.zeros(n_products, dtype=np.int64)
+    has_last = np.zeros(n_products, dtype=np.bool_)
+    
+    event_idx = np.empty(n_events, dtype=np.int64)
+    features = np.empty((n_events, 10), dtype=np.float64)
+    n_out = 0
+    
+    for e in range(n_events):
+        if not is_update[e]:
+            continue
+        p = product_codes[e]
+        
+        for u in range(offsets[e], offsets[e + 1]):
+            if is_bid[u]:
+                if bid_sizes[p] == bid_keys.shape[1]:
+                    bid_keys = _grow(bid_keys)
+                    bid_qtys = _grow(bid_qtys)
+                _book_update(bid_keys, bid_qtys, bid_sizes, p, -prices[u], qtys[u])
+            else:
+                if ask_sizes[p] == ask_keys.shape[1]:
+                    ask_keys = _grow(ask_keys)
+                    ask_qtys = _grow(ask_qtys)
+                _book_update(ask_keys, ask_qtys, ask_sizes, p, prices[u], qtys[u])
+        
+        if has_last[p] and times[e] - last_time[p] < interval_ns:
+            continue
+        nb = min(10, bid_sizes[p])
+        na = min(10, ask_sizes[p])
+        if nb == 0 or na == 0:
+            continue
+        best_bid = -bid_keys[p, 0]
+        best_ask = ask_keys[p, 0]
+        if best_bid > best_ask:
+            continue
+        
+        mid = (best_bid + best_ask) / 2
+        threshold = mid * 0.001
+        bid_volume = 0.0
+        depth_bid = 0.0
+        for k in range(nb):
+            bid_volume += bid_qtys[p, k]
+            if best_bid + bid_keys[p, k] <= threshold:
+                depth_bid += bid_qtys[p, k]
+        ask_volume = 0.0
+        depth_ask = 0.0
+        for k in range(na):
+            ask_volume += ask_qtys[p, k]
+            if ask_keys[p, k] - best_ask <= threshold:
+                depth_ask += ask_qtys[p, k]
+        
+        row = features[n_out]
+        row[0] = best_bid
+        row[1] = best_ask
+        row[2] = mid
+        row[3] = best_ask - best_bid
+        row[4] = (best_ask - best_bid) / best_bid * 100
+        row[5] = bid_volume
+        row[6] = ask_volume
+        row[7] = (bid_volume - ask_volume) / (bid_volume + ask_volume)
+        row[8] = depth_bid
+        row[9] = depth_ask
+        event_idx[n_out] = e
+        n_out += 1
+        last_time[p] = times[e]
+        has_last[p] = True
+    
+    return event_idx[:n_out], features[:n_out]
+
+
+class FeatureEngineer:
+    def __init__(self, level2_file, ticker_file, snapshot_interval_seconds=10):
         self.level2_file = level2_file
         self.ticker_file = ticker_file
         self.snapshot_interval_seconds = snapshot_interval_seconds
         
+    def _load_level2_updates(self):
+        """
+        Load the level2 JSONL file into flat columns with Arrow kernels.
+        
+        The whole file is parsed by pyarrow.json (multithreaded C++), and the
+        nested events/updates lists are flattened with list_flatten /
+        list_parent_indices instead of per-line json.loads and dict walks.
+        
+        Returns:
+            dict of NumPy arrays / lists: per-event 'type', 'product_id',
+            'time_ns', 'timestamp' and 'update_offsets' (updates of event i
+            are rows update_offsets[i]:update_offsets[i+1]), plus per-update
+            'price', 'qty' and 'is_bid'
+        """
+        table = pa_json.read_json(self.level2_file)
+        if 'events' not in table.column_names:
+            return None
+        table = table.filter(pc.is_valid(table['events']))
+        
+        events_col = table['events'].combine_chunks()
+        events = pc.list_flatten(events_col)
+        event_line = pc.list_parent_indices(events_col)
+        
+        # Line timestamps parsed once, vectorized (not pd.to_datetime per line)
+        line_ts = table['timestamp'].to_pandas()
+        line_ns = (pd.to_datetime(line_ts, utc=True, format='ISO8601')
+                   .dt.as_unit('ns').astype('int64').to_numpy())
+        
+        updates_col = pc.struct_field(events, 'updates')
+        updates = pc.list_flatten(updates_col)
+        # Offsets of each event's updates (null/missing lists count as empty)
+        counts = pc.fill_null(pc.list_value_length(updates_col), 0).to_numpy(zero_copy_only=False)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        
+        event_line = event_line.to_numpy(zero_copy_only=False)
+        return {
+            'type': pc.struct_field(events, 'type').to_pylist(),
+            'product_id': pc.struct_field(events, 'product_id').to_pylist(),
+            'time_ns': line_ns[event_line],
+            'timestamp': line_ts.to_numpy()[event_line],
+            'update_offsets': offsets,
+            'price': pc.cast(pc.struct_field(updates, 'price_level'), pa.float64()).to_numpy(zero_copy_only=False),
+            'qty': pc.cast(pc.struct_field(updates, 'new_quantity'), pa.float64()).to_numpy(zero_copy_only=False),
+            'is_bid': pc.equal(pc.struct_field(updates, 'side'), 'bid').to_numpy(zero_copy_only=False),
+        }
+    
     def parse_level2(self):
         """Parse level2 data into order book snapshots (sampled at intervals)"""
-        orderbook = defaultdict(lambda: {'bids': {}, 'asks': {}})
+        orderbook = defaultdict(lambda: {'bids': BookSide(descending=True),
+                                         'asks': BookSide(descending=False)})
         snapshots = []
         last_snapshot_time = defaultdict(lambda: None)
         
         print(f"Sampling snapshots every {self.snapshot_interval_seconds} seconds...")
-        line_count = 0
+        columns = self._load_level2_updates()
+        if columns is None:
+            print("Completed! No level2 events found.")
+            return pd.DataFrame(snapshots)
         
-        with open(self.level2_file, 'r') as f:
-            for line in f:
-                line_count += 1
-                if line_count % 10000 == 0:
-                    print(f"Processed {line_count} lines, created {len(snapshots)} snapshots...")
-                
-                data = json.loads(line)
-                if 'events' not in data:
-                    continue
-                    
-                timestamp = data['timestamp']
-                current_time = pd.to_datetime(timestamp)
+        interval_ns = self.snapshot_interval_seconds * 1_000_000_000
+        if NUMBA_AVAILABLE:
+            return self._parse_level2_jit(columns, interval_ns)
+        
+        offsets = columns['update_offsets'].tolist()
+        prices = columns['price'].tolist()
+        qtys = columns['qty'].tolist()
+        is_bid = columns['is_bid'].tolist()
+        times = columns['time_ns'].tolist()
+        
+        # The order book is a sequential state machine, so events are still
+        # applied in order - but over pre-parsed flat columns
+        for i, event_type in enumerate(columns['type']):
+            if event_type != 'update':
+                continue
                 
-                for event in data['events']:
-                    if event['type'] != 'update':
-                        continue
-                        
-                    product_id = event['product_id']
-                    
-                    # Update order book
-                    for update in event['updates']:
-                        price = float(update['price_level'])
-                        qty = float(update['new_quantity'])
-                        side = update['side']
-                        
-                        book = orderbook[product_id]
-                        if qty == 0:
-                            # Remove level
-                            book['bids' if side == 'bid' else 'asks'].pop(price, None)
-                        else:
-                            book['bids' if side == 'bid' else 'asks'][price] = qty
-                    
-                    # Create snapshot only at intervals
-                    last_time = last_snapshot_time[product_id]
-                    if last_time is None or (current_time - last_time).total_seconds() >= self.snapshot_interval_seconds:
-                        snapshot = self._create_snapshot(
-                            timestamp, product_id, orderbook[product_id]
-                        )
-                        if snapshot:
-                            snapshots.append(snapshot)
-                            last_snapshot_time[product_id] = current_time
-        
-        print(f"Completed! Processed {line_count} lines total.")
+            product_id = columns['product_id'][i]
+            book = orderbook[product_id]
+            
+            # Update order book
+            for u in range(offsets[i], offsets[i + 1]):
+                book['bids' if is_bid[u] else 'asks'].update(prices[u], qtys[u])
+            
+            # Create snapshot only at intervals
+            current_time = times[i]
+            last_time = last_snapshot_time[product_id]
+            if last_time is None or current_time - last_time >= interval_ns:
+                snapshot = self._create_snapshot(
+                    columns['timestamp'][i], product_id, book
+                )
+                if snapshot:
+                    snapshots.append(snapshot)
+                    last_snapshot_time[product_id] = current_time
+        
+        print(f"Completed! Processed {len(offsets) - 1} events total.")
         return pd.DataFrame(snapshots)
     
+    def _parse_level2_jit(self, columns, interval_ns):
+        """parse_level2 body run through the numba order book kernel."""
+        codes, names = pd.factorize(
+            np.asarray(columns['product_id'], dtype=object), use_na_sentinel=False
+        )
+        is_update = np.asarray(columns['type'], dtype=object) == 'update'
+        
+        event_idx, features = _process_level2_updates(
+            is_update, codes.astype(np.int64), columns['time_ns'],
+            columns['update_offsets'].astype(np.int64), columns['price'],
+            columns['qty'], columns['is_bid'], len(names), interval_ns
+        )
+        
+        snapshots = pd.DataFrame(features, columns=SNAPSHOT_FEATURES)
+        snapshots.insert(0, 'timestamp', columns['timestamp'][event_idx])
+        snapshots.insert(1, 'product_id', np.asarray(names, dtype=object)[codes[event_idx]])
+        
+        print(f"Completed! Processed {len(codes)} events total.")
+        return snapshots
+    
     def _create_snapshot(self, timestamp, product_id, orderbook):
         """Create feature vector from order book state"""
-        bids = sorted(orderbook['bids'].items(), reverse=True)[:10]
-        asks = sorted(orderbook['asks'].items())[:10]
+        bid_prices, bid_qtys = orderbook['bids'].top(10)
+        ask_prices, ask_qtys = orderbook['asks'].top(10)
         
-        if not bids or not asks:
+        if not len(bid_prices) or not len(ask_prices):
             return None
         
-        best_bid = bids[0][0]
-        best_ask = asks[0][0]
+        best_bid = float(bid_prices[0])
+        best_ask = float(ask_prices[0])
         
         # Sanity check: best_bid should be <= best_ask
         if best_bid > best_ask:
@@ -95,8 +344,8 @@ class FeatureEngineer:    def __init__(self, level2_file, ticker_file, snapshot_
         }
         
         # Volume features
-        bid_volume = sum(qty for _, qty in bids)
-        ask_volume = sum(qty for _, qty in asks)
+        bid_volume = float(bid_qtys.sum())
+        ask_volume = float(ask_qtys.sum())
         features['bid_volume_10'] = bid_volume
         features['ask_volume_10'] = ask_volume
         features['order_imbalance'] = (bid_volume - ask_volume) / (bid_volume + ask_volume)
@@ -106,40 +355,46 @@ class FeatureEngineer:    def __init__(self, level2_file, ticker_file, snapshot_
         threshold = mid * 0.001  # 0.1% of mid price
         
         # Calculate depth from best bid/ask, not from mid
-        depth_bid = sum(qty for price, qty in bids if best_bid - price <= threshold)
-        depth_ask = sum(qty for price, qty in asks if price - best_ask <= threshold)
-        features['depth_bid_0.1pct'] = depth_bid
-        features['depth_ask_0.1pct'] = depth_ask
+        features['depth_bid_0.1pct'] = float(bid_qtys[best_bid - bid_prices <= threshold].sum())
+        features['depth_ask_0.1pct'] = float(ask_qtys[ask_prices - best_ask <= threshold].sum())
         
         return features
     
     def parse_ticker(self):
         """Parse ticker data for target variables"""
-        tickers = []
-        
-        with open(self.ticker_file, 'r') as f:
-            for line in f:
-                data = json.loads(line)
-                if 'events' not in data:
-                    continue
-                    
-                timestamp = data['timestamp']
-                for event in data['events']:
-                    if 'tickers' not in event:
-                        continue
-                        
-                    for ticker in event['tickers']:
-                        tickers.append({
-                            'timestamp': timestamp,
-                            'product_id': ticker['product_id'],
-                            'price': float(ticker['price']),
-                            'volume_24h': float(ticker['volume_24_h']),
-                            'price_change_24h_pct': float(ticker['price_percent_chg_24_h']),
-                            'high_24h': float(ticker['high_24_h']),
-                            'low_24h': float(ticker['low_24_h']),
-                        })
-        
-        return pd.DataFrame(tickers)
+        table = pa_json.read_json(self.ticker_file)
+        if 'events' not in table.column_names:
+            return pd.DataFrame()
+        table = table.filter(pc.is_valid(table['events']))
+        
+        events_col = table['events'].combine_chunks()
+        events = pc.list_flatten(events_col)
+        if 'tickers' not in [f.name for f in events.type]:
+            return pd.DataFrame()
+        
+        # One row per ticker; map each back to its line's timestamp
+        tickers_col = pc.struct_field(events, 'tickers')
+        tickers = pc.list_flatten(tickers_col)
+        ticker_line = pc.take(
+            pc.list_parent_indices(events_col), pc.list_parent_indices(tickers_col)
+        )
+        
+        # Numeric string fields cast in one vectorized pass each
+        numeric_fields = {
+            'price': 'price',
+            'volume_24h': 'volume_24_h',
+            'price_change_24h_pct': 'price_percent_chg_24_h',
+            'high_24h': 'high_24_h',
+            'low_24h': 'low_24_h',
+        }
+        columns = {
+            'timestamp': pc.take(table['timestamp'], ticker_line),
+            'product_id': pc.struct_field(tickers, 'product_id'),
+        }
+        for name, field in numeric_fields.items():
+            columns[name] = pc.cast(pc.struct_field(tickers, field), pa.float64())
+        
+        return pa.table(columns).to_pandas()
     
     def merge_and_create_targets(self, orderbook_df, ticker_df, target_horizon=60):
         """
@@ -147,11 +402,12 @@ class FeatureEngineer:    def __init__(self, level2_file, ticker_file, snapshot_
         
         target_horizon: seconds into the future to predict
         """
-        # Convert timestamps to datetime
-        orderbook_df['timestamp'] = pd.to_datetime(orderbook_df['timestamp'])
-        ticker_df['timestamp'] = pd.to_datetime(ticker_df['timestamp'])
+        # Convert timestamps to datetime (fixed ISO-8601 layout, no per-row sniffing)
+        orderbook_df['timestamp'] = pd.to_datetime(orderbook_df['timestamp'], format='ISO8601')
+        ticker_df['timestamp'] = pd.to_datetime(ticker_df['timestamp'], format='ISO8601')
         
-        # Merge on nearest timestamp (asof merge)
+        # Merge on nearest timestamp (asof merge). cuDF has no merge_asof, so
+        # this stays on pandas; the result keeps the left (timestamp) order.
         df = pd.merge_asof(
             orderbook_df.sort_values('timestamp'),
             ticker_df.sort_values('timestamp'),
@@ -162,17 +418,19 @@ class FeatureEngineer:    def __init__(self, level2_file, ticker_file, snapshot_
         
         # Create target: price change in next N seconds
         # Compute future timestamp and merge to get future price
-        df = df.sort_values(['product_id', 'timestamp']).reset_index(drop=True)
         df['future_timestamp'] = df['timestamp'] + pd.Timedelta(seconds=target_horizon)
         
-        # Self-merge to get future price at future_timestamp
+        # Self-merge to get future price at future_timestamp. Both sides are
+        # already sorted on their asof key (a constant shift of timestamp), so
+        # no re-sort is needed; `by` matches within each product. Sorting by
+        # product first would break merge_asof's global key ordering check.
         future_df = df[['product_id', 'timestamp', 'price']].rename(
             columns={'timestamp': 'future_timestamp', 'price': 'future_price'}
         )
         
         df = pd.merge_asof(
-            df.sort_values(['product_id', 'future_timestamp']),
-            future_df.sort_values(['product_id', 'future_timestamp']),
+            df,
+            future_df,
             on='future_timestamp',
             by='product_id',
             direction='nearest'
@@ -194,8 +452,8 @@ class FeatureEngineer:    def __init__(self, level2_file, ticker_file, snapshot_
         
         return df
     
-    def run(self, output_file='features.csv'):
-        """Full pipeline"""
+    def run(self, output_file='features.parquet'):
+        """Full pipeline (writes Parquet; pass a .csv path for CSV output)"""
         print("Parsing Level 2 data...")
         orderbook_df = self.parse_level2()
         print(f"Created {len(orderbook_df)} order book snapshots")
@@ -209,7 +467,20 @@ class FeatureEngineer:    def __init__(self, level2_file, ticker_file, snapshot_
         print(f"Final dataset: {len(features_df)} rows")
         
         print(f"\nSaving to {output_file}...")
-        features_df.to_csv(output_file, index=False)
+        if str(output_file).endswith('.csv'):
+            features_df.to_csv(output_file, index=False)
+        else:
+            # Columnar + zstd: far smaller than CSV and no text formatting;
+            # column statistics let readers skip row groups by timestamp
+            table = pa.Table.from_pandas(features_df, preserve_index=False)
+            pq.write_table(
+                table,
+                output_file,
+                compression='zstd',
+                row_group_size=1 << 20,
+                use_dictionary=['product_id', 'direction'],
+                write_statistics=True
+            )
         print("Done!")
         
         return features_df
@@ -222,7 +493,7 @@ if __name__ == "__main__":
         ticker_file="crypto_data_jsonl/ticker_20251107.txt"
     )
     
-    df = engineer.run(output_file="crypto_features.csv")
+    df = engineer.run(output_file="crypto_features.parquet")
     
     # Show sample
     print("\n" + "="*60)
@@ -21,6 +21,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
+import re
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -30,6 +31,13 @@ from sklearn.preprocessing import StandardScaler
 from xgboost import XGBRegressor
 from lightgbm import LGBMRegressor
 
+# Train XGBoost on the GPU when one is visible
+try:
+    import cupy
+    GPU_AVAILABLE = cupy.cuda.runtime.getDeviceCount() > 0
+except Exception:
+    GPU_AVAILABLE = False
+
 # Feature importance tools
 import shap
 from sklearn.inspection import permutation_importance
@@ -39,6 +47,24 @@ print("🔍 FEATURE IMPORTANCE ANALYSIS WITH SHAP")
 print("="*80)
 
 
+# Feature-name categories, checked in priority order: each alternative is a
+# lookahead anchored at the start, so the first matching category wins
+# regardless of where its keyword appears in the name
+_CATEGORY_RE = re.compile(
+    r'(?=.*(vpin))|(?=.*(roll))|(?=.*(imbalance))|(?=.*(rsi|macd|sma|ema|bb))'
+    r'|(?=.*(return))|(?=.*(volatility|parkinson))',
+    re.IGNORECASE
+)
+_CATEGORY_NAMES = [
+    "Microstructure (Order Flow Toxicity)",
+    "Microstructure (Transaction Cost)",
+    "Order Flow (Supply/Demand)",
+    "Technical Indicator",
+    "Momentum",
+    "Volatility",
+]
+
+
 class FeatureImportanceAnalyzer:
     """
     Analyzes which features matter most for crypto price prediction
@@ -53,7 +79,8 @@ class FeatureImportanceAnalyzer:
                  target_horizon=60, test_size=0.2):
         """
         Args:
-            features_csv: Path to ML-ready features
+            features_csv: Path to ML-ready features (.csv from
+                stage3_ml_features.py, or the same table as .parquet)
             target_horizon: Which prediction horizon to use (30, 60, or 300 seconds)
             test_size: Fraction of data for testing
         """
@@ -67,7 +94,10 @@ class FeatureImportanceAnalyzer:
         """Load features and prepare for ML"""
         print(f"\n📖 Loading features from {self.features_csv}...")
         
-        df = pd.read_csv(self.features_csv)
+        if str(self.features_csv).endswith('.csv'):
+            df = pd.read_csv(self.features_csv)
+        else:
+            df = pd.read_parquet(self.features_csv)
         print(f"   ✓ Loaded {len(df):,} samples with {len(df.columns)} columns")
         
         # Select target
@@ -83,13 +113,21 @@ class FeatureImportanceAnalyzer:
         drop_cols += [c for c in df.columns if 'target' in c and c != target_col]
         drop_cols += [c for c in df.columns if 'future_price' in c]
         
-        X = df.drop(columns=drop_cols, errors='ignore')
+        feature_cols = [c for c in df.columns if c not in drop_cols]
+        
+        # Remove any remaining NaN (one dropna pass over features + target
+        # instead of an isna() matrix, a row reduction and a separate OR)
+        df = df.dropna(subset=feature_cols + [target_col])
+        X = df[feature_cols]
         y = df[target_col]
         
-        # Remove any remaining NaN
-        mask = ~(X.isna().any(axis=1) | y.isna())
-        X = X[mask]
-        y = y[mask]
+        # Drop constant features (zero std -> NaN after standardization, and
+        # dead weight for XGBoost/SHAP/permutation). Done before the split so
+        # train and test keep the same columns.
+        keep = X.to_numpy(dtype=np.float64).std(axis=0) > 1e-12
+        if not keep.all():
+            print(f"   ✓ Dropped {int((~keep).sum())} constant features: {list(X.columns[~keep])}")
+            X = X.loc[:, keep]
         
         print(f"   ✓ Features: {X.shape[1]} columns")
         print(f"   ✓ Samples: {len(X):,} (after removing NaN)")
@@ -103,22 +141,12 @@ class FeatureImportanceAnalyzer:
         print(f"   Training: {len(X_train):,} samples")
         print(f"   Test: {len(X_test):,} samples")
         
-        # Standardize
+        # Standardize (kept as float32 ndarrays - no DataFrame re-wrap; the
+        # column names live in self.feature_names)
         print(f"\n🔧 Standardizing features...")
         self.scaler = StandardScaler()
-        X_train_scaled = pd.DataFrame(
-            self.scaler.fit_transform(X_train),
-            columns=X_train.columns,
-            index=X_train.index
-        )
-        X_test_scaled = pd.DataFrame(
-            self.scaler.transform(X_test),
-            columns=X_test.columns,
-            index=X_test.index
-        )
-        
-        self.X_train = X_train_scaled
-        self.X_test = X_test_scaled
+        self.X_train = self.scaler.fit_transform(X_train).astype(np.float32, copy=False)
+        self.X_test = self.scaler.transform(X_test).astype(np.float32, copy=False)
         self.y_train = y_train
         self.y_test = y_test
         self.feature_names = X_train.columns.tolist()
@@ -136,6 +164,9 @@ class FeatureImportanceAnalyzer:
                 learning_rate=0.05,
                 subsample=0.8,
                 colsample_bytree=0.8,
+                tree_method='hist',  # Pre-binned histograms instead of exact split search
+                device='cuda' if GPU_AVAILABLE else 'cpu',
+                max_bin=256,
                 random_state=42,
                 n_jobs=-1
             )
@@ -206,9 +237,11 @@ class FeatureImportanceAnalyzer:
         if self.model is None:
             raise ValueError("Model not trained yet. Call train_model() first.")
         
-        # Compute on test set (more reliable)
+        # Compute on test set (more reliable). Plain C-contiguous arrays are
+        # memory-mapped by joblib's loky workers instead of pickled per worker.
+        X_test = np.ascontiguousarray(self.X_test, dtype=np.float32)
         perm_importance = permutation_importance(
-            self.model, self.X_test, self.y_test,
+            self.model, X_test, self.y_test.to_numpy(),
             n_repeats=n_repeats,
             random_state=42,
             n_jobs=-1
@@ -243,7 +276,8 @@ class FeatureImportanceAnalyzer:
         self.perm_importance = importance
         return importance
     
-    def analyze_shap_importance(self, top_n=20, max_display=30):
+    def analyze_shap_importance(self, top_n=20, max_display=30,
+                                batch_size=50_000, plot_samples=20_000):
         """
         Analyze SHAP values - the GOLD STANDARD for interpretability
         
@@ -252,6 +286,10 @@ class FeatureImportanceAnalyzer:
         - Shows how each feature contributes to individual predictions
         - Reveals interaction effects
         - Industry standard (used by Google, Microsoft, etc.)
+        
+        SHAP values are computed in batches of `batch_size` rows and only
+        sum(|SHAP|) is accumulated, so peak memory doesn't grow with the
+        test set; the plots use a random subsample of `plot_samples` rows.
         """
         print(f"\n🎯 SHAP Analysis (Interpretable ML)...")
         print(f"   Computing SHAP values for {len(self.X_test)} test samples...")
@@ -260,15 +298,33 @@ class FeatureImportanceAnalyzer:
             raise ValueError("Model not trained yet. Call train_model() first.")
         
         # Create SHAP explainer (optimized for tree models)
-        explainer = shap.TreeExplainer(self.model)
+        explainer = shap.TreeExplainer(self.model, feature_perturbation='tree_path_dependent')
+        
+        # Rows kept for the plots (beeswarms saturate visually anyway)
+        n_test = len(self.X_test)
+        rng = np.random.default_rng(42)
+        plot_idx = np.sort(rng.choice(n_test, size=min(n_test, plot_samples), replace=False))
+        
+        # Compute SHAP values batch by batch (uses test set - more honest)
+        abs_shap_sum = np.zeros(len(self.feature_names), dtype=np.float64)
+        plot_shap = []
+        start = 0
+        for chunk in np.array_split(self.X_test, max(1, n_test // batch_size)):
+            chunk_shap = explainer.shap_values(chunk)
+            abs_shap_sum += np.abs(chunk_shap).sum(axis=0)
+            
+            lo, hi = np.searchsorted(plot_idx, [start, start + len(chunk)])
+            plot_shap.append(chunk_shap[plot_idx[lo:hi] - start])
+            start += len(chunk)
+            del chunk_shap
         
-        # Compute SHAP values (uses test set - more honest)
-        shap_values = explainer.shap_values(self.X_test)
+        shap_values = np.concatenate(plot_shap)
+        X_plot = self.X_test[plot_idx]
         
         # Feature importance = mean absolute SHAP value
         importance = pd.DataFrame({
             'feature': self.feature_names,
-            'shap_importance': np.abs(shap_values).mean(axis=0)
+            'shap_importance': abs_shap_sum / n_test
         }).sort_values('shap_importance', ascending=False)
         
         top_features = importance.head(top_n)
@@ -282,8 +338,8 @@ class FeatureImportanceAnalyzer:
         
         # Plot 1: Bar plot (feature importance)
         plt.figure(figsize=(12, 8))
-        shap.summary_plot(shap_values, self.X_test, plot_type="bar", 
-                         max_display=max_display, show=False)
+        shap.summary_plot(shap_values, X_plot, feature_names=self.feature_names,
+                         plot_type="bar", max_display=max_display, show=False)
         plt.title('SHAP Feature Importance', fontsize=14, fontweight='bold', pad=20)
         plt.tight_layout()
         plt.savefig('feature_importance_shap_bar.png', dpi=150, bbox_inches='tight')
@@ -292,7 +348,8 @@ class FeatureImportanceAnalyzer:
         
         # Plot 2: Beeswarm plot (impact + distribution)
         plt.figure(figsize=(12, 10))
-        shap.summary_plot(shap_values, self.X_test, max_display=max_display, show=False)
+        shap.summary_plot(shap_values, X_plot, feature_names=self.feature_names,
+                         max_display=max_display, show=False)
         plt.title('SHAP Values - Feature Impact on Predictions', fontsize=14, fontweight='bold', pad=20)
         plt.tight_layout()
         plt.savefig('feature_importance_shap_beeswarm.png', dpi=150, bbox_inches='tight')
@@ -328,27 +385,28 @@ class FeatureImportanceAnalyzer:
             for feat in sorted(consensus):
                 print(f"      - {feat}")
         
-        # Create comparison dataframe
-        comparison = pd.DataFrame({
-            'feature': self.feature_names
-        })
+        # Rank of each feature (0 = most important) per method, indexed by
+        # position in self.feature_names - no merges needed since all three
+        # tables cover the same features
+        name_to_idx = {name: i for i, name in enumerate(self.feature_names)}
         
-        # Add ranks from each method
-        comparison = comparison.merge(
-            self.builtin_importance.reset_index()[['feature']].reset_index().rename(columns={'index': 'builtin_rank'}),
-            on='feature', how='left'
-        )
-        comparison = comparison.merge(
-            self.perm_importance.reset_index()[['feature']].reset_index().rename(columns={'index': 'perm_rank'}),
-            on='feature', how='left'
-        )
-        comparison = comparison.merge(
-            self.shap_importance.reset_index()[['feature']].reset_index().rename(columns={'index': 'shap_rank'}),
-            on='feature', how='left'
-        )
+        def ranks_of(importance):
+            ranks = np.empty(len(self.feature_names), dtype=np.int32)
+            ranks[[name_to_idx[feat] for feat in importance['feature']]] = np.arange(len(importance))
+            return ranks
+        
+        builtin_rank = ranks_of(self.builtin_importance)
+        perm_rank = ranks_of(self.perm_importance)
+        shap_rank = ranks_of(self.shap_importance)
         
-        # Average rank
-        comparison['avg_rank'] = comparison[['builtin_rank', 'perm_rank', 'shap_rank']].mean(axis=1)
+        # Create comparison dataframe with average rank
+        comparison = pd.DataFrame({
+            'feature': self.feature_names,
+            'builtin_rank': builtin_rank,
+            'perm_rank': perm_rank,
+            'shap_rank': shap_rank,
+            'avg_rank': (builtin_rank + perm_rank + shap_rank) / 3.0
+        })
         comparison = comparison.sort_values('avg_rank')
         
         print(f"\n📊 Top {top_n} by average rank:")
@@ -377,20 +435,8 @@ class FeatureImportanceAnalyzer:
             pct = (importance / self.shap_importance['shap_importance'].sum()) * 100
             
             # Categorize feature
-            if 'vpin' in feat.lower():
-                category = "Microstructure (Order Flow Toxicity)"
-            elif 'roll' in feat.lower():
-                category = "Microstructure (Transaction Cost)"
-            elif 'imbalance' in feat.lower():
-                category = "Order Flow (Supply/Demand)"
-            elif any(x in feat.lower() for x in ['rsi', 'macd', 'sma', 'ema', 'bb']):
-                category = "Technical Indicator"
-            elif 'return' in feat.lower():
-                category = "Momentum"
-            elif 'volatility' in feat.lower() or 'parkinson' in feat.lower():
-                category = "Volatility"
-            else:
-                category = "Other"
+            match = _CATEGORY_RE.match(feat)
+            category = _CATEGORY_NAMES[match.lastindex - 1] if match else "Other"
             
             print(f"\n   {idx+1}. {feat}")
             print(f"      Category: {category}")
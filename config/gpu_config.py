@@ -5,8 +5,18 @@ Centralized configuration for all GPU-accelerated pipeline stages.
 All paths, parameters, and settings in one place.
 """
 
+import functools
+import logging
+import os
+import sys
 from pathlib import Path
 
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
 # Export all configuration variables
 __all__ = [
     # Paths
@@ -16,11 +26,12 @@ __all__ = [
     'PARQUET_SNAPSHOTS_DIR', 'PARQUET_FEATURES_DIR',
     'MODELS_DIR', 'PREDICTIONS_DIR', 'LOGS_DIR', 'METRICS_DIR',
     # Parquet settings
-    'COMPRESSION', 'LEVEL2_PARTITION_COLS', 'TICKER_PARTITION_COLS',
+    'COMPRESSION', 'COMPRESSION_LEVEL', 'LEVEL2_PARTITION_COLS', 'TICKER_PARTITION_COLS',
     'SNAPSHOT_PARTITION_COLS', 'FEATURE_PARTITION_COLS', 'ROW_GROUP_SIZE',
+    'ROW_GROUP_SIZE_BYTES', 'MAX_PAGE_SIZE_BYTES', 'PARTITION_SCHEMA',
     # GPU settings
     'GPU_MEMORY_LIMIT_GB', 'GPU_DEVICE_ID',
-    'ENABLE_GPU_MEMORY_POOL', 'MEMORY_POOL_RELEASE_THRESHOLD',
+    'ENABLE_GPU_MEMORY_POOL', 'MEMORY_POOL_RELEASE_THRESHOLD', 'CUFILE_POLICY',
     # Processing settings
     'CHUNK_SIZE_ROWS', 'BUFFER_SIZE_EVENTS', 'PROCESS_DAYS_AT_ONCE', 'NUM_WORKERS',
     # Orderbook settings
@@ -38,7 +49,7 @@ DATA_DIR = PROJECT_ROOT / "datasets"
 
 # Input paths (existing data)
 RAW_CSV_DIR = DATA_DIR / "raw_csv"         # Legacy CSV files (if any)
-JSONL_INPUT_DIR = PROJECT_ROOT / "crypto_data_jsonl"  # Raw JSONL websocket data (.txt files)
+JSONL_INPUT_DIR = PROJECT_ROOT / "crypto_data_jsonl"  # Raw JSONL websocket data (.txt or .jsonl.zst files)
 
 # Output paths (Parquet format)
 PARQUET_DIR = DATA_DIR / "parquet"
@@ -60,8 +71,11 @@ METRICS_DIR = PROJECT_ROOT / "metrics"
 # ============================================================================
 
 # Compression (trade-off: speed vs size)
-# Options: 'snappy' (fast, 3-5x), 'gzip' (medium, 5-8x), 'zstd' (slow, 8-12x)
-COMPRESSION = 'snappy'
+# Options: 'zstd' (8-12x, decodes near snappy speed at low levels; GPU decode
+# via nvcomp), 'snappy' (fast, 3-5x - opt in for latency-critical lookups),
+# 'gzip' (medium, 5-8x)
+COMPRESSION = 'zstd'
+COMPRESSION_LEVEL = 3  # zstd level when COMPRESSION='zstd' (ignored otherwise)
 
 # Partitioning columns (for predicate pushdown)
 LEVEL2_PARTITION_COLS = ['date', 'product_id']  # e.g., date=2025-11-07/product=BTC-USD/
@@ -69,8 +83,18 @@ TICKER_PARTITION_COLS = ['date']
 SNAPSHOT_PARTITION_COLS = ['date']
 FEATURE_PARTITION_COLS = ['date']
 
+# Typed schema of the Hive partition keys. Pass as
+# partitioning=ds.HivePartitioning(PARTITION_SCHEMA) so 'date' is read as
+# date32 and filters compare integers (enables file skipping).
+PARTITION_SCHEMA = pa.schema([
+    ('date', pa.date32()),
+    ('product_id', pa.string()),
+])
+
 # Row group size (larger = better compression, less parallelism)
 ROW_GROUP_SIZE = 1_000_000  # 1M rows per row group
+ROW_GROUP_SIZE_BYTES = 128 << 20  # Also cap row groups at 128 MB (whichever is hit first)
+MAX_PAGE_SIZE_BYTES = 1 << 20  # 1 MB data pages
 
 # ============================================================================
 # GPU SETTINGS
@@ -87,6 +111,12 @@ GPU_DEVICE_ID = 0  # Which GPU to use (0-7 on DGX-A100)
 ENABLE_GPU_MEMORY_POOL = True
 MEMORY_POOL_RELEASE_THRESHOLD = 0.8  # Release memory when 80% full
 
+# cuDF Parquet/JSON file I/O path (exported as LIBCUDF_CUFILE_POLICY unless
+# already set). 'GDS' moves data GPU <-> NVMe via GPUDirect Storage (cuFile)
+# where the filesystem supports it, and falls back to host bounce buffers
+# otherwise; 'KVIKIO' uses KvikIO's threaded host path; 'OFF' disables both.
+CUFILE_POLICY = 'GDS'
+
 # ============================================================================
 # PROCESSING SETTINGS
 # ============================================================================
@@ -266,6 +296,11 @@ TICKER_SCHEMA = {
 # HELPER FUNCTIONS
 # ============================================================================
 
+# Directories already created by this process (skip repeat mkdir syscalls
+# when several pipeline stages call create_directories())
+_CREATED_DIRS: set = set()
+
+
 def create_directories():
     """Create all necessary directories if they don't exist."""
     dirs = [
@@ -280,7 +315,10 @@ def create_directories():
         METRICS_DIR
     ]
     for d in dirs:
+        if d in _CREATED_DIRS:
+            continue
         d.mkdir(parents=True, exist_ok=True)
+        _CREATED_DIRS.add(d)
     print(f"✓ Created {len(dirs)} directories")
 
 
@@ -300,10 +338,14 @@ def get_date_partition_path(base_dir: Path, date: str, product: str = None) -> P
         >>> get_date_partition_path(PARQUET_LEVEL2_DIR, '2025-11-07', 'BTC-USD')
         PosixPath('datasets/parquet/level2/date=2025-11-07/product=BTC-USD')
     """
-    path = base_dir / f"date={date}"
+    # Intern segments: dates repeat across products (and vice versa), so
+    # wide scans share N+M segment strings instead of allocating N*M.
+    # Join as plain strings and build a single Path at the end (avoids one
+    # PurePath.__truediv__ round trip per segment).
+    path = os.path.join(os.fspath(base_dir), sys.intern(f"date={date}"))
     if product:
-        path = path / f"product={product}"
-    return path
+        path = os.path.join(path, sys.intern(f"product={product}"))
+    return Path(path)
 
 
 def get_parquet_filters(start_date: str = None, end_date: str = None, 
@@ -317,7 +359,7 @@ def get_parquet_filters(start_date: str = None, end_date: str = None,
         product: Product ID filter
     
     Returns:
-        List of filter tuples for pyarrow
+        List of filter tuples for pyarrow (None if no filters given)
     
     Example:
         >>> get_parquet_filters('2025-11-01', '2025-11-15', 'BTC-USD')
@@ -336,42 +378,126 @@ def get_parquet_filters(start_date: str = None, end_date: str = None,
     return filters if filters else None
 
 
-if __name__ == '__main__':
-    # Test configuration
-    print("=" * 80)
-    print("GPU PIPELINE CONFIGURATION")
-    print("=" * 80)
+@functools.lru_cache(maxsize=128)
+def get_gandiva_filter(schema: pa.Schema, filters: tuple):
+    """
+    Build an Arrow filter expression from filter tuples, bound to a schema.
+    
+    String values are cast to the type of the column they compare against
+    (e.g. '2025-11-01' -> date32 for PARTITION_SCHEMA's 'date'), so
+    partitions are pruned with integer comparisons instead of string-level
+    filtering. Gandiva is not part of the standard pyarrow wheels; the
+    returned pc.Expression is evaluated natively by Arrow's Acero engine
+    in Dataset scans. Results are cached per (schema, filters), so repeated
+    scans reuse the same Expression object instead of rebuilding it.
+    
+    Args:
+        schema: Dataset schema, including partition fields
+        filters: Tuple of (column, op, value) filter tuples ('in' values as
+            tuples, so the key is hashable)
+    
+    Returns:
+        pyarrow.compute.Expression for Dataset.to_table/scanner(filter=...)
+        (None if no filters given)
     
-    print(f"\nPaths:")
-    print(f"  Raw CSV:  {RAW_CSV_DIR}")
-    print(f"  Parquet:  {PARQUET_DIR}")
-    print(f"  Models:   {MODELS_DIR}")
+    Example:
+        >>> dataset = ds.dataset(PARQUET_LEVEL2_DIR, partitioning=ds.HivePartitioning(PARTITION_SCHEMA))
+        >>> get_gandiva_filter(dataset.schema, tuple(get_parquet_filters('2025-11-01')))
+        <pyarrow.compute.Expression (date >= 2025-11-01)>
+    """
+    if not filters:
+        return None
     
-    print(f"\nGPU Settings:")
-    print(f"  Device:   GPU {GPU_DEVICE_ID}")
-    print(f"  Memory:   {GPU_MEMORY_LIMIT_GB} GB")
+    bound = []
+    for col, op, val in filters:
+        idx = schema.get_field_index(col)
+        if idx >= 0:
+            field_type = schema.field(idx).type
+            if isinstance(val, str):
+                val = pc.cast(pa.scalar(val), field_type)
+            elif isinstance(val, (tuple, list, set)):
+                val = pc.cast(pa.array(list(val)), field_type)
+        bound.append((col, op, val))
+    return pq.filters_to_expression(bound)
+
+
+def validate_filters(filters: list, dataset) -> list:
+    """
+    Check that filter columns can be pushed down into a dataset scan.
     
-    print(f"\nProcessing:")
-    print(f"  Chunk size:     {CHUNK_SIZE_ROWS:,} rows")
-    print(f"  Snapshot freq:  {SNAPSHOT_INTERVAL_SEC}s")
-    print(f"  Products:       {', '.join(PRODUCTS)}")
+    A column that is neither a partition key nor a top-level Parquet column
+    cannot be used for pruning; pyarrow would silently fall back to
+    post-scan filtering (or fail late), so a warning is logged for each one.
     
-    print(f"\nFeatures:")
-    print(f"  Rolling windows:  {ROLLING_WINDOWS}")
-    print(f"  Technical indicators: {ENABLE_TECHNICAL_INDICATORS}")
-    print(f"  VPIN enabled:     {ENABLE_VPIN}")
+    Args:
+        filters: List of (column, op, value) filter tuples
+        dataset: pyarrow.dataset.Dataset the filters will be applied to
     
-    print(f"\nModel Training:")
-    print(f"  Train/Val/Test:  {TRAIN_DAYS}/{VAL_DAYS}/{TEST_DAYS} days")
-    print(f"  Target horizon:  {TARGET_HORIZON_SEC}s")
+    Returns:
+        List of warning messages (empty if all filters are pushdownable)
     
-    print(f"\nCreating directories...")
+    Example:
+        >>> dataset = ds.dataset(PARQUET_LEVEL2_DIR, partitioning=ds.HivePartitioning(PARTITION_SCHEMA))
+        >>> validate_filters([('date', '>=', '2025-11-01')], dataset)
+        []
+    """
+    partitioning = getattr(dataset, 'partitioning', None)
+    partition_cols = set(partitioning.schema.names) if partitioning is not None else set()
+    data_cols = set(dataset.schema.names)
+    
+    messages = []
+    for col, op, val in filters or []:
+        if col not in partition_cols and col not in data_cols:
+            msg = (f"Filter ({col!r}, {op!r}, {val!r}) references a column that is neither "
+                   f"a partition key nor a Parquet column; it cannot be pushed down")
+            logger.warning(msg)
+            messages.append(msg)
+    
+    return messages
+
+
+if __name__ == '__main__':
+    # Test configuration (report is built up and written once)
+    sys.stdout.write("\n".join([
+        "=" * 80,
+        "GPU PIPELINE CONFIGURATION",
+        "=" * 80,
+        "",
+        "Paths:",
+        f"  Raw CSV:  {RAW_CSV_DIR}",
+        f"  Parquet:  {PARQUET_DIR}",
+        f"  Models:   {MODELS_DIR}",
+        "",
+        "GPU Settings:",
+        f"  Device:   GPU {GPU_DEVICE_ID}",
+        f"  Memory:   {GPU_MEMORY_LIMIT_GB} GB",
+        "",
+        "Processing:",
+        f"  Chunk size:     {CHUNK_SIZE_ROWS:,} rows",
+        f"  Snapshot freq:  {SNAPSHOT_INTERVAL_SEC}s",
+        f"  Products:       {', '.join(PRODUCTS)}",
+        "",
+        "Features:",
+        f"  Rolling windows:  {ROLLING_WINDOWS}",
+        f"  Technical indicators: {ENABLE_TECHNICAL_INDICATORS}",
+        f"  VPIN enabled:     {ENABLE_VPIN}",
+        "",
+        "Model Training:",
+        f"  Train/Val/Test:  {TRAIN_DAYS}/{VAL_DAYS}/{TEST_DAYS} days",
+        f"  Target horizon:  {TARGET_HORIZON_SEC}s",
+        "",
+        "Creating directories...",
+    ]) + "\n")
+    sys.stdout.flush()
     create_directories()
     
-    print(f"\nTesting filter generation...")
     filters = get_parquet_filters('2025-11-01', '2025-11-15', 'BTC-USD')
-    print(f"  Filters: {filters}")
-    
-    print("\n" + "=" * 80)
-    print("✅ CONFIGURATION LOADED SUCCESSFULLY")
-    print("=" * 80)
+    sys.stdout.write("\n".join([
+        "",
+        "Testing filter generation...",
+        f"  Filters: {filters}",
+        "",
+        "=" * 80,
+        "✅ CONFIGURATION LOADED SUCCESSFULLY",
+        "=" * 80,
+    ]) + "\n")
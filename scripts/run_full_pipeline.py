@@ -16,27 +16,31 @@ Expected runtime on NVIDIA DGX-A100:
 Total: ~20 minutes for complete pipeline
 """
 
+import os
 import subprocess
 import sys
 from pathlib import Path
 import time
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
 def run_stage(stage_num, script_name, description):
     """Run a pipeline stage and track timing"""
-    print("\n" + "="*80)
-    print(f"STAGE {stage_num}: {description}")
-    print("="*80 + "\n")
+    print(f"\n{'='*80}\nSTAGE {stage_num}: {description}\n{'='*80}\n", flush=True)
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
+        # stdin from /dev/null: a stray input() in a stage fails with EOFError
+        # instead of hanging a headless run; unbuffered for line-wise logs
         result = subprocess.run(
-            [sys.executable, f"data_pipeline/{script_name}"],
+            [sys.executable, "-u", f"data_pipeline/{script_name}"],
             check=True,
-            capture_output=False
+            stdin=subprocess.DEVNULL,
+            env={**os.environ, 'PYTHONUNBUFFERED': '1'}
         )
         
-        elapsed = time.time() - start_time
+        elapsed = time.perf_counter() - start_time
         print(f"\nStage {stage_num} completed in {elapsed:.1f} seconds ({elapsed/60:.1f} minutes)")
         return True
         
@@ -47,17 +51,20 @@ def run_stage(stage_num, script_name, description):
 def main():
     """Execute full pipeline"""
     
-    print("\n" + "="*80)
-    print("FULL PIPELINE EXECUTION")
-    print("="*80)
-    print("\nThis will run GPU-accelerated pipeline:")
-    print("  Stage 0: JSONL → Parquet conversion")
-    print("  Stage 1: Data quality verification.")
-    print("  Stage 2: Order book reconstruction")
-    print("  Stage 3: Feature engineering.")
-    print("  Stage 4 ...")
-    print("\nEstimated time: ~20 minutes on NVIDIA DGX-A100")
-    print("="*80 + "\n")
+    # Banners are built as one string so each goes out in a single write
+    print("\n".join([
+        "\n" + "="*80,
+        "FULL PIPELINE EXECUTION",
+        "="*80,
+        "\nThis will run GPU-accelerated pipeline:",
+        "  Stage 0: JSONL → Parquet conversion",
+        "  Stage 1: Data quality verification.",
+        "  Stage 2: Order book reconstruction",
+        "  Stage 3: Feature engineering.",
+        "  Stage 4 ...",
+        "\nEstimated time: ~20 minutes on NVIDIA DGX-A100",
+        "="*80 + "\n",
+    ]))
     
     # Confirm
     response = input("Continue? [Y/n]: ")
@@ -65,20 +72,22 @@ def main():
         print("Aborted.")
         return
     
-    pipeline_start = time.time()
+    pipeline_start = time.perf_counter()
     
     # Stage 0: JSONL → Parquet (GPU)
-    print("\n" + "="*80)
-    print(f"STAGE 0: JSONL → Parquet Conversion (GPU)")
-    print("="*80 + "\n")
-    start_time = time.time()
+    print(f"\n{'='*80}\nSTAGE 0: JSONL → Parquet Conversion (GPU)\n{'='*80}\n", flush=True)
+    start_time = time.perf_counter()
     try:
-        result = subprocess.run(
-            [sys.executable, "src/data/converters/jsonl_to_parquet.py"],
+        # Own process: Stage 0's RMM pool and CUDA context are released when
+        # it exits, instead of holding VRAM while Stages 2 and 3 (also
+        # subprocesses on the same GPU) run
+        subprocess.run(
+            [sys.executable, "-u", str(PROJECT_ROOT / "src/data/converters/jsonl_to_parquet.py")],
             check=True,
-            capture_output=False
+            stdin=subprocess.DEVNULL,
+            env={**os.environ, 'PYTHONUNBUFFERED': '1'}
         )
-        elapsed = time.time() - start_time
+        elapsed = time.perf_counter() - start_time
         print(f"\nStage 0 completed in {elapsed:.1f} seconds ({elapsed/60:.1f} minutes)")
     except subprocess.CalledProcessError as e:
         print(f"\nStage 0 failed with error code {e.returncode}")
@@ -96,19 +105,21 @@ def main():
         return
     
     # Success!
-    total_time = time.time() - pipeline_start
+    total_time = time.perf_counter() - pipeline_start
     
-    print("\n" + "="*80)
-    print("PIPELINE COMPLETE!")
-    print("="*80)
-    print(f"\nTotal runtime: {total_time:.1f} seconds ({total_time/60:.1f} minutes)")
-    print("\nOutput files:")
-    print("  - datasets/raw_csv/level2_*.csv")
-    print("  - datasets/raw_csv/ticker_*.csv")
-    print("  - datasets/market_snapshots.csv")
-    print("  - datasets/crypto_features.csv")
-    print("\nReady for ML modeling!")
-    print("="*80 + "\n")
+    print("\n".join([
+        "\n" + "="*80,
+        "PIPELINE COMPLETE!",
+        "="*80,
+        f"\nTotal runtime: {total_time:.1f} seconds ({total_time/60:.1f} minutes)",
+        "\nOutput files:",
+        "  - datasets/raw_csv/level2_*.csv",
+        "  - datasets/raw_csv/ticker_*.csv",
+        "  - datasets/market_snapshots.csv",
+        "  - datasets/crypto_features.csv",
+        "\nReady for ML modeling!",
+        "="*80 + "\n",
+    ]))
 
 if __name__ == '__main__':
     main()
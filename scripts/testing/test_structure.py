@@ -10,11 +10,16 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from tree_index import index_tree
+
 def test_imports():
     """Test that all imports work correctly"""
     print("Testing Project Structure\n")
     print("="*60)
     
+    # One scandir walk answers every existence check and item count below
+    paths, child_counts = index_tree(PROJECT_ROOT)
+    
     # Test 1: Config import
     print("\n[Test 1] Testing config import...")
     try:
@@ -49,7 +54,7 @@ def test_imports():
         "src/utils/__init__.py"
     ]
     for util_file in util_files:
-        if Path(util_file).exists():
+        if util_file in paths:
             print(f"Found: {util_file}")
         else:
             print(f"Missing: {util_file}")
@@ -57,8 +62,8 @@ def test_imports():
     
     # Test 4: Check GPU utilities exist (but don't import cudf)
     print("\n[Test 4] Checking GPU utility files exist...")
-    gpu_mem_path = Path("src/utils/gpu_memory.py")
-    if gpu_mem_path.exists():
+    gpu_mem_path = "src/utils/gpu_memory.py"
+    if gpu_mem_path in paths:
         print(f"GPU utilities found: {gpu_mem_path}")
     else:
         print(f"GPU utilities not found: {gpu_mem_path}")
@@ -71,7 +76,7 @@ def test_imports():
         "src/data/converters/csv_to_parquet.py"
     ]
     for script in converter_scripts:
-        if Path(script).exists():
+        if script in paths:
             print(f"Found: {script}")
         else:
             print(f"Missing: {script}")
@@ -85,8 +90,8 @@ def test_imports():
         "_archive_old_structure/old_data"
     ]
     for dir_path in archive_dirs:
-        if Path(dir_path).exists():
-            count = len(list(Path(dir_path).iterdir()))
+        if dir_path in paths:
+            count = child_counts.get(dir_path, 0)
             print(f"Archive exists: {dir_path} ({count} items)")
         else:
             print(f"Archive missing: {dir_path}")
@@ -0,0 +1,34 @@
+"""
+Project tree listing shared by the structure/path check scripts
+"""
+
+import os
+
+
+def index_tree(root, max_depth=3, skip=('.git', '__pycache__', 'crypto_data_jsonl')):
+    """
+    List the project tree once with os.scandir (instead of one stat per check)
+    
+    Directories are opened down to `max_depth` levels; names in `skip` are
+    listed but not descended into.
+    
+    Returns:
+        (paths, child_counts): set of relative POSIX paths, and the number of
+        direct entries in every scanned directory (keyed the same way)
+    """
+    paths = set()
+    child_counts = {}
+    stack = [(str(root), '', 0)]
+    while stack:
+        directory, rel_dir, depth = stack.pop()
+        count = 0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                count += 1
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                paths.add(rel)
+                if (depth < max_depth and entry.name not in skip
+                        and entry.is_dir(follow_symlinks=False)):
+                    stack.append((entry.path, rel, depth + 1))
+        child_counts[rel_dir] = count
+    return paths, child_counts
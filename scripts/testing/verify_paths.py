@@ -7,20 +7,27 @@ Usage:
     python scripts/testing/verify_paths.py
 """
 
+import importlib
+import re
 import sys
 import os
 from pathlib import Path
 
+from tree_index import index_tree
+
 # Colors for terminal output
 GREEN = '\033[92m'
 RED = '\033[91m'
 YELLOW = '\033[93m'
 RESET = '\033[0m'
 
+# Imports from the pre-restructure 'gpu' package
+OLD_GPU_IMPORT = re.compile(rb'^[ \t]*(?:from|import)[ \t]+gpu\.', re.MULTILINE)
+
 def test_import(module_path, description):
     """Test if a module can be imported"""
     try:
-        exec(f"import {module_path}")
+        importlib.import_module(module_path)
         print(f"{GREEN}✓{RESET} {description}: {module_path}")
         return True
     except ImportError as e:
@@ -32,14 +39,13 @@ def test_import(module_path, description):
         print(f"  Unexpected error: {type(e).__name__}: {e}")
         return False
 
-def test_file_exists(file_path, description):
-    """Test if a file exists"""
-    path = Path(file_path)
-    if path.exists():
-        print(f"{GREEN}✓{RESET} {description}: {file_path}")
+def test_file_exists(root, file_path, description, paths):
+    """Test if a file exists (`paths` is the index_tree() set of `root`)"""
+    if file_path in paths:
+        print(f"{GREEN}✓{RESET} {description}: {root / file_path}")
         return True
     else:
-        print(f"{RED}✗{RESET} {description}: {file_path}")
+        print(f"{RED}✗{RESET} {description}: {root / file_path}")
         print(f"  File not found")
         return False
 
@@ -53,10 +59,16 @@ def main():
     project_root = Path(__file__).parent.parent.parent
     os.chdir(project_root)
     sys.path.insert(0, str(project_root))
+    # Make modules created since interpreter start visible to the finders
+    importlib.invalidate_caches()
     
     print(f"Project Root: {project_root}")
     print()
     
+    # One scandir walk answers every existence check below
+    paths, _ = index_tree(project_root, skip=('.git', '__pycache__', 'crypto_data_jsonl',
+                                                  '_archive_old_structure'))
+    
     # Track results
     tests_passed = 0
     tests_failed = 0
@@ -115,7 +127,7 @@ def main():
     ]
     
     for file_path, description in critical_files:
-        if test_file_exists(project_root / file_path, description):
+        if test_file_exists(project_root, file_path, description, paths):
             tests_passed += 1
         else:
             tests_failed += 1
@@ -143,8 +155,7 @@ def main():
     ]
     
     for dir_path, description in critical_dirs:
-        path = project_root / dir_path
-        if path.exists():
+        if dir_path in paths:
             print(f"{GREEN}✓{RESET} {description}: {dir_path}")
             tests_passed += 1
         else:
@@ -160,28 +171,24 @@ def main():
     print("Checking for Old Path References")
     print("-" * 70)
     
-    # Search for old 'gpu.' imports in src/
-    import subprocess
-    
-    try:
-        result = subprocess.run(
-            ['grep', '-r', 'from gpu\\.', 'src/', '--include=*.py'],
-            capture_output=True,
-            text=True,
-            cwd=project_root
-        )
-        
-        if result.returncode == 0 and result.stdout:
-            print(f"{RED}✗{RESET} Found old 'gpu.' imports in src/:")
-            print(result.stdout)
-            tests_failed += 1
-        else:
-            print(f"{GREEN}✓{RESET} No old 'gpu.' imports found in src/")
-            tests_passed += 1
-    except FileNotFoundError:
-        # grep not available (Windows without Git Bash)
-        print(f"{YELLOW}⚠{RESET} grep not available, skipping old path search")
-        print("  Manually check for 'from gpu.' or 'import gpu.' in src/ files")
+    # Search for old 'gpu.' imports in src/ (in-process, no grep needed)
+    hits = []
+    for py_file in sorted((project_root / "src").rglob("*.py")):
+        source = py_file.read_bytes()
+        for match in OLD_GPU_IMPORT.finditer(source):
+            line_no = source.count(b"\n", 0, match.start()) + 1
+            line_end = source.find(b"\n", match.end())
+            line = source[match.start():line_end if line_end != -1 else None]
+            line = line.decode(errors="replace").strip()
+            hits.append(f"{py_file.relative_to(project_root)}:{line_no}: {line}")
+    
+    if hits:
+        print(f"{RED}✗{RESET} Found old 'gpu.' imports in src/:")
+        print("\n".join(hits))
+        tests_failed += 1
+    else:
+        print(f"{GREEN}✓{RESET} No old 'gpu.' imports found in src/")
+        tests_passed += 1
     
     print()
     
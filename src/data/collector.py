@@ -2,20 +2,50 @@
 import websocket
 import json
 import threading
+import queue
 import time
 from datetime import datetime
 import os
-from collections import deque
+
+# Fast JSON parsing (SIMD-accelerated); fall back to stdlib if not installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Channel markers as they appear in compact Coinbase data frames
+TICKER_MARKER = '"channel":"ticker"'
+LEVEL2_MARKER = '"channel":"l2_data"'
+
+# Flush early (outside the 30 s cycle) once a channel buffers this much
+FLUSH_THRESHOLD_BYTES = 64 << 20
 
 
 class CryptoDataCollector:
-    def __init__(self, output_dir="crypto_data_jsonl"):
+    def __init__(self, output_dir="crypto_data_jsonl", compress=False):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
 
-        # Buffers will now store raw JSON strings
-        self.ticker_buffer = deque(maxlen=1000)
-        self.level2_buffer = deque(maxlen=1000)
+        # Optional inline zstd compression: each flush is appended as one
+        # zstd frame, so a crash loses at most the unflushed buffer
+        self.compressor = None
+        if compress:
+            try:
+                import zstandard
+                self.compressor = zstandard.ZstdCompressor(level=3)
+            except ImportError:
+                print("zstandard not installed, writing uncompressed .txt logs")
+        self.file_ext = "jsonl.zst" if self.compressor else "txt"
+
+        # Buffers hold raw newline-terminated JSONL bytes. They grow until
+        # flushed (nothing is dropped under burst load) and are swapped out
+        # whole at flush time, so no per-message objects are kept around
+        self.ticker_buffer = bytearray()
+        self.level2_buffer = bytearray()
+        self.buffer_lock = threading.Lock()
+        # Serializes flushes so an early flush can't reorder file writes
+        self.flush_lock = threading.Lock()
+        self.flush_pending = False
 
         # Get filenames for today
         self.ticker_file = ""
@@ -29,6 +59,12 @@ class CryptoDataCollector:
             'start_time': datetime.now()
         }
 
+        # Raw frames are handed off the websocket read thread and classified
+        # on a worker, so recv never waits on parsing or buffer locks
+        self.inbox = queue.SimpleQueue()
+        self.classifier = threading.Thread(target=self._classify_loop, daemon=True)
+        self.classifier.start()
+
         # Start flush thread
         self.running = True
         threading.Thread(target=self.periodic_flush, daemon=True).start()
@@ -36,8 +72,8 @@ class CryptoDataCollector:
     def update_filenames(self):
         """Sets the output filenames based on the current date"""
         date_str = datetime.now().strftime('%Y%m%d')
-        self.ticker_file = f"{self.output_dir}/ticker_{date_str}.txt"
-        self.level2_file = f"{self.output_dir}/level2_{date_str}.txt"
+        self.ticker_file = f"{self.output_dir}/ticker_{date_str}.{self.file_ext}"
+        self.level2_file = f"{self.output_dir}/level2_{date_str}.{self.file_ext}"
         print(f"\n[NEW FILES CREATED]\nTicker: {self.ticker_file}\nLevel2: {self.level2_file}\n")
 
     def flush_buffers(self):
@@ -45,25 +81,38 @@ class CryptoDataCollector:
 
         # Check if the date has changed (for file rotation)
         current_date = datetime.now().strftime('%Y%m%d')
-        if not self.ticker_file.endswith(f"{current_date}.txt"):
+        if not self.ticker_file.endswith(f"{current_date}.{self.file_ext}"):
             print("--- New day detected, rotating log files... ---")
             self.update_filenames()
 
-        # Flush ticker data
-        try:
-            if self.ticker_buffer:
-                # 'a' (append) mode will create the file if it doesn't exist
-                with open(self.ticker_file, 'a') as f:
-                    while self.ticker_buffer:
-                        f.write(self.ticker_buffer.popleft() + '\n')
-
-            # Flush level2 data
-            if self.level2_buffer:
-                with open(self.level2_file, 'a') as f:
-                    while self.level2_buffer:
-                        f.write(self.level2_buffer.popleft() + '\n')
-        except Exception as e:
-            print(f"Error flushing buffers: {e}")
+        with self.flush_lock:
+            # Swap both buffers out under the lock, then write outside it
+            with self.buffer_lock:
+                ticker_data = self.ticker_buffer
+                self.ticker_buffer = bytearray()
+                level2_data = self.level2_buffer
+                self.level2_buffer = bytearray()
+                self.flush_pending = False
+
+            try:
+                # Flush ticker data
+                if ticker_data:
+                    self._append_bytes(self.ticker_file, ticker_data)
+
+                # Flush level2 data
+                if level2_data:
+                    self._append_bytes(self.level2_file, level2_data)
+            except Exception as e:
+                print(f"Error flushing buffers: {e}")
+
+    def _append_bytes(self, path, data):
+        """Append buffered JSONL bytes with one write"""
+        if self.compressor:
+            data = self.compressor.compress(data)
+
+        # 'ab' (append) mode will create the file if it doesn't exist
+        with open(path, 'ab', buffering=1 << 20) as f:
+            f.write(data)
 
     def periodic_flush(self):
         """Flush buffers every 30 seconds"""
@@ -86,10 +135,38 @@ class CryptoDataCollector:
         print("----------------------------------------\n")
 
     def on_message(self, ws, message):
-        """Handle incoming WebSocket messages"""
+        """Handle incoming WebSocket messages (queue only; runs on the recv thread)"""
+        self.inbox.put(message)
+
+    def _classify_loop(self):
+        """Classify queued frames until the None sentinel arrives"""
+        while True:
+            message = self.inbox.get()
+            if message is None:
+                return
+            self._classify_message(message)
+
+    def _drain_inbox(self):
+        """Stop the classifier after it has buffered every queued frame"""
+        self.inbox.put(None)
+        self.classifier.join(timeout=10)
+
+    def _classify_message(self, message):
+        """Route one raw frame to its channel buffer"""
         try:
-            # We still need to parse it once to check the channel
-            data = json.loads(message)
+            # Fast path: data frames carry the channel near the start, so a
+            # substring check on the head avoids parsing the whole frame
+            head = message[:256]
+            if TICKER_MARKER in head:
+                self._record_ticker(message)
+                return
+            if LEVEL2_MARKER in head:
+                self._record_level2(message)
+                return
+
+            # Slow path (system messages, unexpected formatting): parse once
+            # to check the channel
+            data = _json_loads(message)
 
             if 'channel' not in data:
                 # Ignore system messages like 'subscriptions'
@@ -104,21 +181,42 @@ class CryptoDataCollector:
 
             # Instead of parsing, just append the raw message string
             if channel == 'ticker':
-                self.ticker_buffer.append(message)
-                self.stats['ticker_count'] += 1
+                self._record_ticker(message)
+            elif channel == 'l2_data':
+                self._record_level2(message)
 
-                if self.stats['ticker_count'] % 100 == 0:
-                    print("Ticker")
+        except Exception as e:
+            print(f"Error in _classify_message: {e} | Data: {message}")
 
-            elif channel == 'l2_data':
-                self.level2_buffer.append(message)
-                self.stats['level2_count'] += 1
+    def _record_ticker(self, message):
+        """Buffer a raw ticker frame"""
+        data = message.encode()
+        with self.buffer_lock:
+            self.ticker_buffer += data
+            self.ticker_buffer += b'\n'
+            self._flush_early_if_full(self.ticker_buffer)
+        self.stats['ticker_count'] += 1
 
-                if self.stats['level2_count'] % 1000 == 0:
-                    print("Level2")
+        if self.stats['ticker_count'] % 100 == 0:
+            print("Ticker")
 
-        except Exception as e:
-            print(f"Error in on_message: {e} | Data: {message}")
+    def _record_level2(self, message):
+        """Buffer a raw level2 frame"""
+        data = message.encode()
+        with self.buffer_lock:
+            self.level2_buffer += data
+            self.level2_buffer += b'\n'
+            self._flush_early_if_full(self.level2_buffer)
+        self.stats['level2_count'] += 1
+
+        if self.stats['level2_count'] % 1000 == 0:
+            print("Level2")
+
+    def _flush_early_if_full(self, buffer):
+        """Start a background flush once a buffer passes the threshold (call with buffer_lock held)"""
+        if len(buffer) >= FLUSH_THRESHOLD_BYTES and not self.flush_pending:
+            self.flush_pending = True
+            threading.Thread(target=self.flush_buffers, daemon=True).start()
 
     def on_open(self, ws):
         """Subscribe to channels on connection"""
@@ -147,6 +245,7 @@ class CryptoDataCollector:
     def on_close(self, ws, close_status_code, close_msg):
         print("Connection closed")
         self.running = False
+        self._drain_inbox()
         self.flush_buffers()  # Final flush on close
         self.print_stats()
 
@@ -168,10 +267,20 @@ class CryptoDataCollector:
         except KeyboardInterrupt:
             print("\nStopping collection...")
             self.running = False
+            self._drain_inbox()
             self.flush_buffers()  # Final flush on exit
             print("Goodbye.")
 
 
 if __name__ == "__main__":
-    collector = CryptoDataCollector(output_dir="crypto_data_jsonl")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Coinbase websocket JSONL collector")
+    parser.add_argument("--output-dir", default="crypto_data_jsonl",
+                        help="Directory for the daily JSONL files")
+    parser.add_argument("--compress", action="store_true",
+                        help="Write zstd-compressed .jsonl.zst files instead of .txt")
+    args = parser.parse_args()
+
+    collector = CryptoDataCollector(output_dir=args.output_dir, compress=args.compress)
     collector.start()
\ No newline at end of file
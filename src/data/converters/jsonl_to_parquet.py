@@ -15,12 +15,17 @@ Usage:
     python jsonl_to_parquet.py --validate                    # Validate existing Parquet
 """
 
+import functools
+import io
 import json
+import multiprocessing
 import sys
 import os
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import argparse
 import time
 
@@ -37,6 +42,18 @@ if project_root not in sys.path:
 # GPU libraries
 import cudf
 import cupy as cp
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Fast JSON parsing (SIMD-accelerated); fall back to stdlib if not installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so the existing
+# error handling in the flatteners works for both.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 # Import configuration
 try:
@@ -44,7 +61,14 @@ try:
         JSONL_INPUT_DIR,
         PARQUET_LEVEL2_DIR,
         PARQUET_TICKER_DIR,
-        COMPRESSION
+        COMPRESSION,
+        COMPRESSION_LEVEL,
+        ROW_GROUP_SIZE,
+        ROW_GROUP_SIZE_BYTES,
+        MAX_PAGE_SIZE_BYTES,
+        ENABLE_GPU_MEMORY_POOL,
+        GPU_MEMORY_LIMIT_GB,
+        CUFILE_POLICY
     )
 except ImportError as e:
     print(f"Error importing config: {e}")
@@ -52,9 +76,18 @@ except ImportError as e:
     sys.exit(1)
 # --- PATH FIX END ---
 
+# CPU level2 flattener (kept free of GPU imports for the parser processes)
+from src.data.converters.level2_flatten import (
+    LEVEL2_ARROW_TYPES,
+    new_level2_columns,
+    level2_columns_to_arrow,
+    flatten_level2_line,
+    parse_level2_slice,
+)
+
 # Import GPU utilities from restructured paths
 try:
-    from src.utils.gpu_memory import GPUMemoryMonitor
+    from src.utils.gpu_memory import GPUMemoryManager, GPUMemoryMonitor
 except ImportError as e:
     print(f"Warning: Could not import GPUMemoryMonitor: {e}")
     print("Falling back to dummy implementation")
@@ -69,72 +102,39 @@ except ImportError as e:
         def __exit__(self, *args):
             pass
 
+    class GPUMemoryManager:
+        def __init__(self, *args, **kwargs):
+            self.rmm_pool = False
 
-def flatten_level2_line(line: str) -> List[Dict[str, Any]]:
-    """
-    Flatten a single level2 JSONL line into multiple rows.
+        def run_with_guardrails(self, fn, data, n_cap=1, itr=1):
+            step = max(1, -(-len(data) // itr))
+            return [fn(data[i:i + step]) for i in range(0, len(data), step)]
 
-    Input structure:
-    {
-        "channel": "l2_data",
-        "timestamp": "2025-11-07T09:59:01.328203255Z",
-        "sequence_num": 19,
-        "events": [{
-            "type": "update",
-            "product_id": "BTC-USD",
-            "updates": [
-                {
-                    "side": "bid",
-                    "event_time": "2025-11-07T09:59:00.692602Z",
-                    "price_level": "100877.72",
-                    "new_quantity": "0.00198"
-                }
-            ]
-        }]
-    }
 
-    Output: List of flat dictionaries, one per update
-    """
-    try:
-        data = json.loads(line)
+# Strict dtypes enforced on every level2 chunk (avoids concat/append issues)
+LEVEL2_TARGET_DTYPES = {
+    'price_level': 'float64',
+    'new_quantity': 'float64',
+    'sequence_num': 'int64',
+    'channel': 'object',
+    'event_type': 'object',
+    'product_id': 'object',
+    'side': 'object',
+    'date': 'object'
+}
 
-        # Extract top-level metadata
-        timestamp = data.get('timestamp', '')
-        channel = data.get('channel', '')
-        sequence_num = data.get('sequence_num', 0)
+# String columns written as plain UTF8 so every chunk of a partition shares
+# one Parquet schema
+LEVEL2_STRING_COLUMNS = ('date', 'channel', 'event_type', 'product_id', 'side')
 
-        rows = []
-        for event in data.get('events', []):
-            event_type = event.get('type', '')
-            product_id = event.get('product_id', '')
-
-            for update in event.get('updates', []):
-                row = {
-                    'timestamp': timestamp,
-                    'channel': channel,
-                    'sequence_num': sequence_num,
-                    'event_type': event_type,
-                    'product_id': product_id,
-                    'side': update.get('side', ''),
-                    'event_time': update.get('event_time', ''),
-                    'price_level': update.get('price_level', ''),
-                    'new_quantity': update.get('new_quantity', '')
-                }
-                rows.append(row)
-
-        return rows
 
-    except json.JSONDecodeError as e:
-        # Skip malformed JSON lines silently (common in streaming data)
-        return []
-    except KeyError as e:
-        # Skip lines with missing required fields
-        print(f"Skipping line with missing field: {e}")
-        return []
-    except Exception as e:
-        # Log unexpected errors but continue processing
-        print(f"Unexpected error flattening level2 line: {type(e).__name__}: {e}")
-        return []
+@functools.lru_cache(maxsize=None)
+def unified_level2_schema(schema: pa.Schema) -> pa.Schema:
+    """Normalize a chunk's Arrow schema (cached: chunks share the same schema)."""
+    return pa.schema([
+        pa.field(field.name, pa.string()) if field.name in LEVEL2_STRING_COLUMNS else field
+        for field in schema
+    ])
 
 
 def flatten_ticker_line(line: str) -> List[Dict[str, Any]]:
@@ -161,7 +161,7 @@ def flatten_ticker_line(line: str) -> List[Dict[str, Any]]:
     Output: List of flat dictionaries, one per ticker
     """
     try:
-        data = json.loads(line)
+        data = _json_loads(line)
 
         # Extract top-level metadata
         timestamp = data.get('timestamp', '')
@@ -208,12 +208,618 @@ def flatten_ticker_line(line: str) -> List[Dict[str, Any]]:
         return []
 
 
+def is_zstd_file(path: Path) -> bool:
+    """True for collector logs written with --compress (*.jsonl.zst)."""
+    return str(path).endswith('.zst')
+
+
+def open_jsonl(path: Path):
+    """
+    Open a JSONL log for binary line-by-line reading.
+
+    Plain .txt logs are opened directly; .jsonl.zst logs are decompressed
+    on the fly (the collector appends one zstd frame per flush, hence
+    read_across_frames).
+    """
+    if is_zstd_file(path):
+        import zstandard
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, 'rb'), read_across_frames=True, closefd=True
+        )
+        return io.BufferedReader(reader, buffer_size=1 << 20)
+    return open(path, 'rb')
+
+
+def find_jsonl_files(input_path: Path, prefix: str) -> List[Path]:
+    """Find a channel's daily logs (.txt and .jsonl.zst), sorted by name."""
+    files = list(input_path.glob(f"{prefix}_*.txt")) + list(input_path.glob(f"{prefix}_*.jsonl.zst"))
+    return sorted(files, key=lambda p: p.name)
+
+
+def jsonl_file_date(path: Path) -> str:
+    """Partition date from a log name, e.g. level2_20251107.txt -> 2025-11-07."""
+    date_str = path.name.split('_')[1].split('.')[0]
+    return datetime.strptime(date_str, '%Y%m%d').strftime('%Y-%m-%d')
+
+
+def estimate_ticker_rows(path: Path, probe_lines: int = 1000) -> int:
+    """
+    Estimate the flattened row count of a ticker JSONL file.
+
+    Flattens the first `probe_lines` lines and scales the rows-per-byte
+    ratio to the full file size, so the row list can be allocated once.
+    """
+    if is_zstd_file(path):
+        return 0  # Compressed size says nothing about the line count
+
+    size = path.stat().st_size
+    probe_bytes = 0
+    probe_rows = 0
+    with open(path, 'rb') as f:
+        for _ in range(probe_lines):
+            line = f.readline()
+            if not line:
+                break
+            probe_bytes += len(line)
+            if line.strip():
+                probe_rows += len(flatten_ticker_line(line))
+
+    if not probe_bytes:
+        return 0
+    return int(size * probe_rows / probe_bytes)
+
+
+def _split_byte_ranges(path: Path, num_parts: int) -> List[Tuple[int, int]]:
+    """Split a file into ~equal (start, end) byte ranges snapped to line starts."""
+    size = path.stat().st_size
+    if size == 0:
+        return []
+
+    step = max(1, size // num_parts)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, num_parts):
+            f.seek(max(i * step, bounds[-1]))
+            f.readline()  # Skip to the start of the next full line
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_level2_stream(path: Path) -> Tuple[pa.Table, int, int]:
+    """Flatten every level2 line of a (compressed) JSONL log sequentially."""
+    columns = new_level2_columns()
+    line_count = 0
+    error_count = 0
+
+    with open_jsonl(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            line_count += 1
+            if not flatten_level2_line(line, columns):
+                error_count += 1
+
+    return level2_columns_to_arrow(columns), line_count, error_count
+
+
+def new_level2_parser_pool(num_workers: int = None) -> ProcessPoolExecutor:
+    """
+    Create the parser process pool for read_level2_file.
+
+    Workers are started by a forkserver, never forked: the pool is used from
+    the prefetch thread after CUDA is initialised, and a forked child would
+    inherit the driver state and held locks. Create it once per conversion
+    run; workers start on first use and are reused for every file.
+    """
+    return ProcessPoolExecutor(
+        max_workers=num_workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context('forkserver'),
+    )
+
+
+def read_level2_file(path: Path, num_workers: int = None,
+                     executor: ProcessPoolExecutor = None) -> Tuple[pa.Table, int, int]:
+    """
+    Flatten a level2 JSONL file using a pool of parser processes.
+
+    The file is split into byte ranges on line boundaries; each worker
+    flattens one range into an Arrow table and the results are concatenated
+    in file order.
+
+    Args:
+        path: JSONL file
+        num_workers: Number of byte ranges/worker processes (None = os.cpu_count())
+        executor: Pool from new_level2_parser_pool() (None = a temporary pool
+            for this file only)
+
+    Returns:
+        (Arrow table, line count, malformed line count)
+    """
+    if is_zstd_file(path):
+        # Compressed logs can't be split by byte offset: decompress and
+        # flatten as one stream
+        return _parse_level2_stream(path)
+
+    num_workers = num_workers or os.cpu_count() or 1
+    ranges = _split_byte_ranges(Path(path), num_workers)
+    if not ranges:
+        return level2_columns_to_arrow(new_level2_columns()), 0, 0
+
+    if executor is None:
+        with new_level2_parser_pool(min(num_workers, len(ranges))) as pool:
+            return read_level2_file(path, num_workers, pool)
+
+    results = list(executor.map(
+        parse_level2_slice,
+        [str(path)] * len(ranges),
+        [start for start, _ in ranges],
+        [end for _, end in ranges],
+    ))
+
+    table = pa.concat_tables([tbl for tbl, _, _ in results])
+    line_count = sum(n for _, n, _ in results)
+    error_count = sum(e for _, _, e in results)
+    return table, line_count, error_count
+
+
+# Bytes of JSONL parsed per cudf.read_json call (the nested parse needs
+# several times the input size in VRAM; stays below the 2 GiB strings limit)
+GPU_JSON_CHUNK_BYTES = 256 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def level2_json_dtypes() -> Dict[str, Any]:
+    """
+    Nested cudf.read_json schema for level2 frames (built once, reused).
+
+    With prune_columns=True, libcudf materializes only these fields and
+    skips nested type inference; everything stays a string until the chunk
+    conversion, matching LEVEL2_ARROW_TYPES.
+    """
+    update = cudf.StructDtype({
+        'side': 'str',
+        'event_time': 'str',
+        'price_level': 'str',
+        'new_quantity': 'str',
+    })
+    event = cudf.StructDtype({
+        'type': 'str',
+        'product_id': 'str',
+        'updates': cudf.ListDtype(update),
+    })
+    return {
+        'channel': 'str',
+        'timestamp': 'str',
+        'sequence_num': 'int64',
+        'events': cudf.ListDtype(event),
+    }
+
+
+def _flatten_level2_json(raw: cudf.DataFrame) -> cudf.DataFrame:
+    """Explode a cudf.read_json level2 frame to one row per update."""
+    events = raw[['timestamp', 'channel', 'sequence_num', 'events']].explode('events')
+    event = events['events'].struct
+    updates = cudf.DataFrame({
+        'timestamp': events['timestamp'],
+        'channel': events['channel'],
+        'sequence_num': events['sequence_num'],
+        'event_type': event.field('type'),
+        'product_id': event.field('product_id'),
+        'updates': event.field('updates'),
+    }).explode('updates')
+
+    # Events with an empty/missing updates list explode to a null row
+    updates = updates[updates['updates'].notna()]
+    update = updates['updates'].struct
+
+    return cudf.DataFrame({
+        'timestamp': updates['timestamp'],
+        'channel': updates['channel'],
+        'sequence_num': updates['sequence_num'],
+        'event_type': updates['event_type'],
+        'product_id': updates['product_id'],
+        'side': update.field('side'),
+        'event_time': update.field('event_time'),
+        'price_level': update.field('price_level'),
+        'new_quantity': update.field('new_quantity'),
+    }).reset_index(drop=True)
+
+
+def read_level2_file_gpu(path: Path,
+                         chunk_bytes: int = GPU_JSON_CHUNK_BYTES) -> Tuple[cudf.DataFrame, int, int]:
+    """
+    Flatten a level2 JSONL file entirely on the GPU.
+
+    cudf.read_json tokenizes the file straight into device memory, producing
+    list<struct> columns for `events` and `updates`; two explodes and struct
+    field extraction then yield one row per update without touching Python.
+    Uncompressed files are read in `chunk_bytes` byte ranges (libcudf snaps
+    each range to whole lines) and flattened one range at a time, so only
+    one range's nested parse is in VRAM at once.
+    Unlike read_level2_file, malformed lines are not skipped (libcudf raises),
+    so callers should fall back to the CPU reader on error.
+
+    Args:
+        path: JSONL file
+        chunk_bytes: Bytes per read_json byte range
+
+    Returns:
+        (cuDF DataFrame with the LEVEL2_ARROW_TYPES columns, line count, 0)
+    """
+    if is_zstd_file(path):
+        # Byte ranges index the uncompressed stream; read compressed logs whole
+        ranges = [None]
+    else:
+        ranges = [(offset, chunk_bytes) for offset in range(0, Path(path).stat().st_size, chunk_bytes)]
+
+    frames = []
+    line_count = 0
+    for byte_range in ranges:
+        raw = cudf.read_json(
+            str(path), lines=True, engine='cudf', byte_range=byte_range,
+            compression='zstd' if is_zstd_file(path) else 'infer',
+            dtype=level2_json_dtypes(), prune_columns=True
+        )
+        if len(raw):
+            line_count += len(raw)
+            frames.append(_flatten_level2_json(raw))
+        del raw
+
+    if not frames:
+        return cudf.DataFrame.from_arrow(level2_columns_to_arrow(new_level2_columns())), 0, 0
+    df = frames[0] if len(frames) == 1 else cudf.concat(frames, ignore_index=True)
+    return df, line_count, 0
+
+
+def prefetch_level2_file(path: Path, num_workers: int = None,
+                         gpu_json: bool = False,
+                         executor: ProcessPoolExecutor = None):
+    """
+    Read step for the next level2 file, run in the background while the
+    current file is being split and written.
+
+    In CPU mode the file is fully parsed and flattened to an Arrow table.
+    In GPU mode device memory still holds the current file, so the file is
+    only hinted into the OS page cache (sequential readahead) and parsed on
+    the GPU once it becomes the current file.
+
+    Args:
+        path: JSONL file
+        num_workers: Parser processes (CPU mode)
+        gpu_json: If True, only warm the page cache
+        executor: Parser pool shared across files (CPU mode)
+
+    Returns:
+        read_level2_file() result, or None in GPU mode
+    """
+    if not gpu_json:
+        return read_level2_file(path, num_workers=num_workers, executor=executor)
+
+    if hasattr(os, 'posix_fadvise'):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    return None
+
+
+# Coinbase timestamps truncated to microseconds, e.g. 2025-11-07T09:59:01.328203
+ISO_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+def parse_iso_timestamps(series: cudf.Series) -> cudf.Series:
+    """
+    Parse Coinbase ISO-8601 timestamp strings to UTC datetimes on the GPU.
+
+    Timestamps arrive with nanoseconds ('2025-11-07T09:59:01.328203255Z') or
+    microseconds ('2025-11-07T09:59:00.692602Z'). Slicing to 26 characters
+    gives one fixed layout that libcudf parses without leaving VRAM. If any
+    value doesn't fit that layout, falls back to pandas format='mixed'.
+
+    Args:
+        series: cuDF string Series
+
+    Returns:
+        cuDF datetime Series (UTC)
+    """
+    try:
+        parsed = cudf.to_datetime(series.str.slice(0, 26), format=ISO_TIMESTAMP_FORMAT)
+        if parsed.null_count > series.null_count:
+            raise ValueError("unparsed timestamps")
+        return parsed.dt.tz_localize('UTC')
+    except (ValueError, TypeError, NotImplementedError):
+        import pandas as pd
+        return cudf.from_pandas(
+            pd.to_datetime(series.to_pandas(), format='mixed', utc=True, errors='coerce')
+        )
+
+
+# Coinbase sends prices/quantities as decimal strings with at most 8 decimal
+# places; decimal64(18, 8) holds them exactly (up to 10 integer digits)
+LEVEL2_DECIMAL_COLUMNS = ('price_level', 'new_quantity')
+LEVEL2_DECIMAL_PRECISION = 18
+LEVEL2_DECIMAL_SCALE = 8
+
+
+def parse_decimal_strings(series: cudf.Series) -> cudf.Series:
+    """Parse decimal strings to exact fixed-point decimal64 (invalid -> null)."""
+    dtype = cudf.Decimal64Dtype(precision=LEVEL2_DECIMAL_PRECISION, scale=LEVEL2_DECIMAL_SCALE)
+    return series.where(series.str.isfloat()).astype(dtype)
+
+
+def prepare_level2_chunk(table, date: str,
+                         fixed_point_prices: bool = False) -> cudf.DataFrame:
+    """
+    Upload a flattened level2 Arrow slice and convert its columns.
+
+    All conversions (timestamp parsing, numeric casts, partition date) are
+    applied in a single DataFrame.assign, so no intermediate frame is
+    materialized between steps.
+
+    Args:
+        table: Slice of the table built by level2_columns_to_arrow, or of
+            the cuDF frame from read_level2_file_gpu (already on device)
+        date: Partition date (YYYY-MM-DD)
+        fixed_point_prices: Store price_level/new_quantity as exact
+            decimal64(18, 8) instead of float64
+
+    Returns:
+        cuDF DataFrame with parsed columns and a 'date' column
+    """
+    if fixed_point_prices:
+        to_number = parse_decimal_strings
+    else:
+        # libcudf string->float kernel; unparseable values become null
+        to_number = lambda s: cudf.to_numeric(s, errors='coerce')
+
+    df = table if isinstance(table, cudf.DataFrame) else cudf.DataFrame.from_arrow(table)
+    return df.assign(
+        timestamp=parse_iso_timestamps(df['timestamp']),
+        event_time=parse_iso_timestamps(df['event_time']),
+        price_level=to_number(df['price_level']),
+        new_quantity=to_number(df['new_quantity']),
+        date=date,
+    )
+
+
+def split_level2_chunk(chunk_table, date: str,
+                       fixed_point_prices: bool = False) -> List[Tuple[str, cudf.DataFrame]]:
+    """
+    Convert one flattened level2 chunk and split it by product.
+
+    Safe to re-run on the same input (no shared state is modified), so the
+    OOM guardrails can retry it on smaller slices. GPU out-of-memory errors
+    propagate; other conversion errors fall back to raw string columns.
+
+    Args:
+        chunk_table: Arrow table slice or cuDF frame (see prepare_level2_chunk)
+        date: Partition date (YYYY-MM-DD)
+        fixed_point_prices: Store price_level/new_quantity as decimal64
+
+    Returns:
+        List of (product_id, cuDF DataFrame) pairs
+    """
+    # Upload chunk and convert timestamps/numerics in one pass
+    try:
+        df = prepare_level2_chunk(chunk_table, date, fixed_point_prices)
+
+        # Check for failed conversions
+        null_timestamps = df['timestamp'].isnull().sum()
+        null_event_times = df['event_time'].isnull().sum()
+        if null_timestamps > 0 or null_event_times > 0:
+            print(f"Warning: {null_timestamps} invalid timestamps, {null_event_times} invalid event_times")
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(f"Error converting chunk columns: {type(e).__name__}: {e}")
+        # Try to continue with raw string columns
+        print("Keeping timestamps as strings")
+        if isinstance(chunk_table, cudf.DataFrame):
+            df = chunk_table
+        else:
+            df = cudf.DataFrame.from_arrow(chunk_table)
+        df['date'] = date
+
+    # Enforce strict schema on all columns to avoid concat issues
+    for col, dtype in LEVEL2_TARGET_DTYPES.items():
+        if fixed_point_prices and col in LEVEL2_DECIMAL_COLUMNS:
+            continue  # Already exact decimal64
+        if col in df.columns:
+            try:
+                if df[col].dtype != dtype:
+                    df[col] = df[col].astype(dtype)
+            except (ValueError, TypeError) as e:
+                print(f"Warning: Failed to cast '{col}' to {dtype}: {e}")
+                print(f"Sample values: {df[col].head(3).to_pandas().tolist()}")
+            except MemoryError:
+                raise
+            except Exception as e:
+                print(f"Unexpected error casting '{col}': {type(e).__name__}: {e}")
+
+    # Split the chunk by product. One GPU groupby (sort + offsets) yields
+    # every product's rows, instead of a full-column mask + gather per product.
+    try:
+        return list(df.groupby('product_id', sort=False))
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(f"Error splitting by product: {type(e).__name__}: {e}")
+        return []
+
+
+# VRAM promised to in-flight single-concat writes. Partition writers run
+# concurrently and would all see the same free-memory reading, so each
+# reserves its concat size under the lock before allocating.
+_concat_lock = threading.Lock()
+_concat_reserved_bytes = 0
+
+
+def _reserve_concat_bytes(nbytes: int) -> bool:
+    """Reserve `nbytes` of free VRAM for a concat; False if it doesn't fit."""
+    global _concat_reserved_bytes
+    with _concat_lock:
+        free_bytes, _ = cp.cuda.Device().mem_info
+        if _concat_reserved_bytes + nbytes >= 0.6 * free_bytes:
+            return False
+        _concat_reserved_bytes += nbytes
+        return True
+
+
+def _release_concat_bytes(nbytes: int) -> None:
+    """Return a reservation taken by _reserve_concat_bytes."""
+    global _concat_reserved_bytes
+    with _concat_lock:
+        _concat_reserved_bytes -= nbytes
+
+
+def write_level2_partition(output_path: Path, date: str, product_id: str,
+                           chunks: List[cudf.DataFrame], compression: str,
+                           write_csv: bool = False) -> None:
+    """
+    Write all chunks of one product to its date/product_id partition.
+
+    Safe to run concurrently for different products: each call writes its
+    own partition directory, and cuDF releases the GIL while encoding.
+
+    Args:
+        output_path: Level2 Parquet root directory
+        date: Partition date (YYYY-MM-DD)
+        product_id: Product ID (e.g., 'BTC-USD')
+        chunks: cuDF DataFrames for this product, in order
+        compression: Compression codec
+        write_csv: If True, also write a CSV file alongside the Parquet file
+    """
+    reserved_bytes = 0
+    try:
+        # Create partition directory
+        partition_dir = output_path / f"date={date}" / f"product_id={product_id}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        output_file = partition_dir / "data.parquet"
+
+        total_rows = 0
+
+        # If all chunks fit comfortably in free VRAM (after what concurrent
+        # writers have reserved), concat once (the result is allocated at
+        # its final size) and take the single-chunk GPU write
+        if len(chunks) > 1:
+            total_bytes = sum(int(c.memory_usage(deep=True).sum()) for c in chunks)
+            if _reserve_concat_bytes(total_bytes):
+                reserved_bytes = total_bytes
+                try:
+                    chunks = [cudf.concat(chunks, ignore_index=True)]
+                except MemoryError:
+                    pass  # Fall through to the streaming writer
+
+        # If only one chunk, write directly (no concat needed)
+        if len(chunks) == 1:
+            try:
+                chunks[0].to_parquet(
+                    output_file,
+                    compression=compression,
+                    index=False,
+                    row_group_size_rows=ROW_GROUP_SIZE,
+                    row_group_size_bytes=ROW_GROUP_SIZE_BYTES,
+                    max_page_size_bytes=MAX_PAGE_SIZE_BYTES
+                )
+                total_rows = len(chunks[0])
+
+                # Optionally write CSV (for Power BI compatibility)
+                if write_csv:
+                    csv_file = output_file.with_suffix('.csv')
+                    # One D2H copy to Arrow, then pyarrow's vectorized CSV
+                    # writer (same serializer as the streaming branch)
+                    pa_csv.write_csv(
+                        chunks[0].to_arrow(),
+                        csv_file,
+                        write_options=pa_csv.WriteOptions(include_header=True, delimiter=',')
+                    )
+                    csv_size_mb = csv_file.stat().st_size / (1024 * 1024)
+                    print(f"Wrote CSV: {csv_file.name} ({csv_size_mb:.2f} MB)")
+            except Exception as e:
+                print(f"Error writing Parquet for {product_id}: {type(e).__name__}: {e}")
+                return
+        else:
+            # VRAM is tight: stream each chunk into one Parquet file through a
+            # single ParquetWriter (no temp files, no read-back/concat pass)
+            writer = None
+            csv_writer = None
+            csv_file = output_file.with_suffix('.csv')
+
+            try:
+                for chunk in chunks:
+                    table = chunk.to_arrow()
+
+                    if writer is None:
+                        # Force string columns to plain UTF8 so every chunk
+                        # matches the first one's schema
+                        unified_schema = unified_level2_schema(table.schema)
+                        writer = pq.ParquetWriter(
+                            output_file,
+                            unified_schema,
+                            compression=compression,
+                            compression_level=COMPRESSION_LEVEL if compression == 'zstd' else None,
+                            # Low-cardinality strings: dictionary pages + zstd
+                            use_dictionary=list(LEVEL2_STRING_COLUMNS),
+                            data_page_size=MAX_PAGE_SIZE_BYTES
+                        )
+                        if write_csv:
+                            csv_writer = pa_csv.CSVWriter(
+                                csv_file,
+                                unified_schema,
+                                write_options=pa_csv.WriteOptions(include_header=True, delimiter=',')
+                            )
+
+                    table = table.cast(unified_schema)
+                    # pyarrow only caps row groups by rows: derive the row
+                    # count that keeps each group under ROW_GROUP_SIZE_BYTES
+                    bytes_per_row = max(table.nbytes // max(table.num_rows, 1), 1)
+                    row_group_rows = max(min(ROW_GROUP_SIZE, ROW_GROUP_SIZE_BYTES // bytes_per_row), 1)
+                    writer.write_table(table, row_group_size=row_group_rows)
+                    # Optionally write CSV (for Power BI compatibility)
+                    if csv_writer is not None:
+                        csv_writer.write_table(table)
+                    total_rows += table.num_rows
+
+                    del table
+            finally:
+                if writer is not None:
+                    writer.close()
+                if csv_writer is not None:
+                    csv_writer.close()
+
+            if csv_writer is not None:
+                csv_size_mb = csv_file.stat().st_size / (1024 * 1024)
+                print(f"   ✓ Wrote CSV: {csv_file.name} ({csv_size_mb:.2f} MB)")
+
+    except Exception as e:
+        print(f"Error processing product {product_id}: {type(e).__name__}: {e}")
+        return
+    finally:
+        if reserved_bytes:
+            _release_concat_bytes(reserved_bytes)
+
+    # Print summary
+    file_size_mb = output_file.stat().st_size / (1024 * 1024)
+    print(f"Wrote {total_rows:,} rows for {product_id} ({file_size_mb:.2f} MB)")
+
+
 def convert_level2_data(
         input_dir: str,
         output_dir: str,
-        compression: str = "snappy",
+        compression: str = "zstd",
         skip_latest: bool = True,
-        write_csv: bool = False
+        write_csv: bool = False,
+        num_workers: int = None,
+        fixed_point_prices: bool = False,
+        gpu_json: bool = False
 ):
     """
     Convert Level2 JSONL files to Parquet format.
@@ -225,13 +831,18 @@ def convert_level2_data(
         compression: Compression codec (snappy, gzip, zstd)
         skip_latest: If True, skip the most recent file (likely being written)
         write_csv: If True, also write CSV files alongside Parquet
+        num_workers: Parser processes per file (None = os.cpu_count())
+        fixed_point_prices: Store price_level/new_quantity as exact
+            decimal64(18, 8) instead of float64
+        gpu_json: Parse and flatten JSONL with cudf.read_json on the GPU
+            (falls back to the CPU parser if libcudf rejects the file)
     """
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
     # Find all level2 JSONL files, sorted by name (which includes date)
-    jsonl_files = sorted(input_path.glob("level2_*.txt"))
+    jsonl_files = find_jsonl_files(input_path, "level2")
 
     if not jsonl_files:
         print(f"No level2 JSONL files found in {input_dir}")
@@ -245,297 +856,140 @@ def convert_level2_data(
 
     print(f"Found {len(jsonl_files)} level2 JSONL files\n")
 
-    for jsonl_file in jsonl_files:
-        print(f"Processing: {jsonl_file.name}\n")
-
-        # Extract date from filename (e.g., level2_20251107.txt -> 20251107)
-        date_str = jsonl_file.stem.split('_')[1]
-        date = datetime.strptime(date_str, '%Y%m%d').strftime('%Y-%m-%d')
+    # Read/parse of file N+1 overlaps the GPU split + write of file N. One
+    # worker bounds this to a single file in flight ahead of the current one.
+    # One parser pool serves every file of the run. Both executors are shut
+    # down on every exit path, including the early returns below: the
+    # prefetch thread first, then the parser processes it may be using.
+    with new_level2_parser_pool(num_workers) as parsers, \
+            ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending = prefetcher.submit(
+            prefetch_level2_file, jsonl_files[0], num_workers, gpu_json, parsers
+        )
+
+        for file_index, jsonl_file in enumerate(jsonl_files):
+            print(f"Processing: {jsonl_file.name}\n")
+            current = pending
+            if file_index + 1 < len(jsonl_files):
+                pending = prefetcher.submit(
+                    prefetch_level2_file, jsonl_files[file_index + 1], num_workers, gpu_json,
+                    parsers
+                )
+
+            # Extract date from filename (e.g., level2_20251107.txt -> 2025-11-07)
+            date = jsonl_file_date(jsonl_file)
+
+            monitor = GPUMemoryMonitor(f"Converting {jsonl_file.name}")
+            # Start per-file timer
+            file_start = time.perf_counter()
+            had_error = False
+            try:
+                with monitor:
+                    # Flatten nested JSON structure on the GPU, or take the table
+                    # parsed in the background by parallel worker processes
+                    flattened_table = None
+                    if gpu_json:
+                        try:
+                            current.result()  # page-cache warmup only
+                            flattened_table, line_count, error_count = read_level2_file_gpu(jsonl_file)
+                        except Exception as e:
+                            print(f"GPU JSON reader failed ({type(e).__name__}: {e}), using CPU parser")
 
-        monitor = GPUMemoryMonitor(f"Converting {jsonl_file.name}")
-        # Start per-file timer
-        file_start = time.perf_counter()
-        had_error = False
-        try:
-            with monitor:
-                # Flatten nested JSON structure line-by-line (memory-efficient)
-                flattened_rows = []
-                line_count = 0
-                error_count = 0
-
-                try:
-                    with open(jsonl_file, 'r', encoding='utf-8') as f:
-                        for line_num, line in enumerate(f, 1):
-                            line_count += 1
-                            if not line.strip():
-                                continue
-                            rows = flatten_level2_line(line)
-                            if not rows and line.strip():  # Line had content but failed to parse
-                                error_count += 1
-                            flattened_rows.extend(rows)
-                except FileNotFoundError:
-                    print(f"File not found: {jsonl_file}")
-                    had_error = True
-                    return
-                except PermissionError:
-                    print(f"Permission denied reading: {jsonl_file}")
-                    had_error = True
-                    return
-                except UnicodeDecodeError as e:
-                    print(f"Encoding error in {jsonl_file}: {e}")
-                    had_error = True
-                    return
-                except Exception as e:
-                    print(f"Error reading {jsonl_file}: {type(e).__name__}: {e}")
-                    had_error = True
-                    return
-
-                if error_count > 0:
-                    print(f"Skipped {error_count} malformed lines out of {line_count}")
-
-                if not flattened_rows:
-                    print(f"No valid data found in {jsonl_file.name}")
-                    had_error = False
-                    return
-
-                print(f"Flattened {len(flattened_rows):,} orderbook updates from JSONL")
-
-                # Use a dictionary to collect all chunks for a given product
-                # This avoids repeated Parquet read/write/concat which causes schema conflicts
-                from typing import Dict, List
-                product_chunks: Dict[str, List] = {}
-
-                # Process in chunks to avoid GPU OOM (10M rows at a time)
-                chunk_size = 10_000_000
-
-                for chunk_start in range(0, len(flattened_rows), chunk_size):
-                    chunk_end = min(chunk_start + chunk_size, len(flattened_rows))
-                    chunk_rows = flattened_rows[chunk_start:chunk_end]
-
-                    # Convert chunk to cuDF DataFrame
-                    df = cudf.DataFrame(chunk_rows)
-
-                    # Add date column for partitioning
-                    df['date'] = date
-
-                    # Convert timestamps to datetime (handle mixed formats)
                     try:
-                        # Convert to pandas temporarily for robust datetime parsing, then back to cuDF
-                        df_timestamp = df['timestamp'].to_pandas()
-                        df_event_time = df['event_time'].to_pandas()
-
-                        import pandas as pd
-                        df['timestamp'] = cudf.from_pandas(pd.to_datetime(df_timestamp, format='mixed', utc=True, errors='coerce'))
-                        df['event_time'] = cudf.from_pandas(pd.to_datetime(df_event_time, format='mixed', utc=True, errors='coerce'))
-                        
-                        # Check for failed conversions
-                        null_timestamps = df['timestamp'].isnull().sum()
-                        null_event_times = df['event_time'].isnull().sum()
-                        if null_timestamps > 0 or null_event_times > 0:
-                            print(f"Warning: {null_timestamps} invalid timestamps, {null_event_times} invalid event_times")
-                    except Exception as e:
-                        print(f"Error converting timestamps: {type(e).__name__}: {e}")
-                        # Try to continue with string timestamps
-                        print("Keeping timestamps as strings")
-
-                    # Enforce strict schema on all columns to avoid concat issues
-                    TARGET_DTYPES = {
-                        'price_level': 'float64',
-                        'new_quantity': 'float64',
-                        'sequence_num': 'int64',
-                        'channel': 'object',
-                        'event_type': 'object',
-                        'product_id': 'object',
-                        'side': 'object',
-                        'date': 'object'
-                    }
-
-                    for col, dtype in TARGET_DTYPES.items():
-                        if col in df.columns:
-                            try:
-                                if df[col].dtype != dtype:
-                                    df[col] = df[col].astype(dtype)
-                            except (ValueError, TypeError) as e:
-                                print(f"Warning: Failed to cast '{col}' to {dtype}: {e}")
-                                print(f"Sample values: {df[col].head(3).to_pandas().tolist()}")
-                            except Exception as e:
-                                print(f"Unexpected error casting '{col}': {type(e).__name__}: {e}")
-
-                    # Split the chunk by product and store in our dictionary
-                    try:
-                        unique_products = df['product_id'].unique().to_pandas()
-                        for product_id in unique_products:
-                            try:
-                                product_df = df[df['product_id'] == product_id].copy()
-                                if product_id not in product_chunks:
-                                    product_chunks[product_id] = []
-                                product_chunks[product_id].append(product_df)
-                            except Exception as e:
-                                print(f"Error processing product {product_id}: {type(e).__name__}: {e}")
-                                continue
-                    except Exception as e:
-                        print(f"Error splitting by product: {type(e).__name__}: {e}")
-                        # Try to continue without splitting
-                        pass
-
-                    # Free memory after each chunk
-                    del df, chunk_rows
-                    cp.get_default_memory_pool().free_all_blocks()
-
-                # --- WRITE STEP: WRITE CHUNKS EFFICIENTLY TO AVOID MEMORY EXHAUSTION ---
-                # For large files (48M+ rows), a single concat can exhaust VRAM
-                # Strategy: Write chunks iteratively, then merge if needed
-                for product_id, chunks in product_chunks.items():
-                    try:
-                        # Create partition directory
-                        partition_dir = output_path / f"date={date}" / f"product_id={product_id}"
-                        partition_dir.mkdir(parents=True, exist_ok=True)
-                        output_file = partition_dir / "data.parquet"
-
-                        total_rows = 0
-
-                        # If only one chunk, write directly (no concat needed)
-                        if len(chunks) == 1:
-                            try:
-                                chunks[0].to_parquet(
-                                    output_file,
-                                    compression=compression,
-                                    index=False
-                                )
-                                total_rows = len(chunks[0])
-
-                                # Optionally write CSV (for Power BI compatibility)
-                                if write_csv:
-                                    csv_file = output_file.with_suffix('.csv')
-                                    chunks[0].to_csv(csv_file, index=False)
-                                    csv_size_mb = csv_file.stat().st_size / (1024 * 1024)
-                                    print(f"Wrote CSV: {csv_file.name} ({csv_size_mb:.2f} MB)")
-                            except Exception as e:
-                                print(f"Error writing Parquet for {product_id}: {type(e).__name__}: {e}")
-                                continue
-                        else:
-                            # Multiple chunks: concat in smaller batches to avoid VRAM exhaustion
-                            # Strategy: concat 2-3 chunks at a time, write to temp files, then merge
-                            import tempfile
-                            temp_files = []
-                            batch_size = 2  # Concat 2 chunks at a time (safer for memory)
-
-                            try:
-                                for i in range(0, len(chunks), batch_size):
-                                    batch = chunks[i:i + batch_size]
-
-                                    if len(batch) == 1:
-                                        batch_df = batch[0]
-                                    else:
-                                        batch_df = cudf.concat(batch, ignore_index=True)
-
-                                    # Write batch to temporary file
-                                    temp_file = tempfile.NamedTemporaryFile(
-                                        delete=False,
-                                        suffix='.parquet',
-                                        dir=partition_dir
-                                    )
-                                    temp_file.close()
-
-                                    batch_df.to_parquet(
-                                        temp_file.name,
-                                        compression=compression,
-                                        index=False
-                                    )
-                                    temp_files.append(temp_file.name)
-                                    total_rows += len(batch_df)
-
-                                    del batch_df, batch
-                                    cp.get_default_memory_pool().free_all_blocks()
-
-                                # Now merge all temp files into final output using PyArrow (CPU-based, memory efficient)
-                                import pyarrow.parquet as pq
-                                import pyarrow as pa
-
-                                # 1. Inspect the schema of the first file to get a baseline
-                                base_schema = pq.read_schema(temp_files[0])
-
-                                # 2. Create a "Strict Schema" that forces string columns to be plain Strings (UTF8)
-                                # This prevents PyArrow from auto-detecting "Dictionary" encoding for some chunks
-                                fixed_fields = []
-                                for field in base_schema:
-                                    if field.name in ['date', 'channel', 'event_type', 'product_id', 'side']:
-                                        fixed_fields.append(pa.field(field.name, pa.string()))
-                                    else:
-                                        fixed_fields.append(field)
-
-                                unified_schema = pa.schema(fixed_fields)
-
-                                # 3. Read all files using this enforced schema
-                                # This forces dictionary-encoded chunks to expand back to strings immediately
-                                tables = [pq.read_table(tf, schema=unified_schema) for tf in temp_files]
-
-                                # 4. Concatenate safely
-                                combined_table = pa.concat_tables(tables)
-
-                                # Write final Parquet table
-                                pq.write_table(
-                                    combined_table,
-                                    output_file,
-                                    compression=compression
-                                )
-
-                                # Optionally write CSV (for Power BI compatibility)
-                                if write_csv:
-                                    import pyarrow.csv as pa_csv
-                                    csv_file = output_file.with_suffix('.csv')
-                                    pa_csv.write_csv(
-                                        combined_table,
-                                        csv_file,
-                                        write_options=pa_csv.WriteOptions(include_header=True, delimiter=',')
-                                    )
-                                    csv_size_mb = csv_file.stat().st_size / (1024 * 1024)
-                                    print(f"   ✓ Wrote CSV: {csv_file.name} ({csv_size_mb:.2f} MB)")
-
-                                del tables, combined_table
-
-                            finally:
-                                # Clean up temp files
-                                import os
-                                for tf in temp_files:
-                                    try:
-                                        os.unlink(tf)
-                                    except:
-                                        pass
-
+                        if not gpu_json:
+                            flattened_table, line_count, error_count = current.result()
+                        elif flattened_table is None:
+                            flattened_table, line_count, error_count = read_level2_file(
+                                jsonl_file, num_workers=num_workers, executor=parsers
+                            )
+                    except FileNotFoundError:
+                        print(f"File not found: {jsonl_file}")
+                        had_error = True
+                        return
+                    except PermissionError:
+                        print(f"Permission denied reading: {jsonl_file}")
+                        had_error = True
+                        return
+                    except UnicodeDecodeError as e:
+                        print(f"Encoding error in {jsonl_file}: {e}")
+                        had_error = True
+                        return
                     except Exception as e:
-                        print(f"Error processing product {product_id}: {type(e).__name__}: {e}")
-                        continue
-
-                    # Print summary
-                    file_size_mb = output_file.stat().st_size / (1024 * 1024)
-                    print(f"Wrote {total_rows:,} rows for {product_id} ({file_size_mb:.2f} MB)")
-
-                    del chunks
-                    cp.get_default_memory_pool().free_all_blocks()
-
-                # Clean up
-                del flattened_rows
-                cp.get_default_memory_pool().free_all_blocks()
-        except Exception as e:
-            print(f"Error processing {jsonl_file.name}: {e}")
-            import traceback
-            traceback.print_exc()
-            had_error = True
-        finally:
-            file_elapsed = time.perf_counter() - file_start
-            if had_error:
-                print(f"File time (error): {file_elapsed:.2f}s")
-                continue
-            else:
-                print(f"File time: {file_elapsed:.2f}s")
-                print()
+                        print(f"Error reading {jsonl_file}: {type(e).__name__}: {e}")
+                        had_error = True
+                        return
+
+                    if error_count > 0:
+                        print(f"Skipped {error_count} malformed lines out of {line_count}")
+
+                    num_rows = len(flattened_table)
+                    if not num_rows:
+                        print(f"No valid data found in {jsonl_file.name}")
+                        had_error = False
+                        return
+
+                    print(f"Flattened {num_rows:,} orderbook updates from JSONL")
+
+                    # Each chunk below is a zero-copy slice of the Arrow table,
+                    # uploaded to the GPU with a single H2D copy (or a slice of
+                    # the frame already on the GPU)
+
+                    # Use a dictionary to collect all chunks for a given product
+                    # This avoids repeated Parquet read/write/concat which causes schema conflicts
+                    from typing import Dict, List
+                    product_chunks: Dict[str, List] = {}
+
+                    # Process in chunks to avoid GPU OOM (10M rows at a time)
+                    chunk_size = 10_000_000
+
+                    # Convert chunks under OOM guardrails: on GPU OOM the failed
+                    # chunk is retried in smaller slices instead of aborting
+                    manager = GPUMemoryManager()
+                    chunk_results = manager.run_with_guardrails(
+                        lambda chunk_table: split_level2_chunk(chunk_table, date, fixed_point_prices),
+                        flattened_table,
+                        itr=max(1, -(-num_rows // chunk_size))
+                    )
+                    for chunk_products in chunk_results:
+                        for product_id, product_df in chunk_products:
+                            if product_id not in product_chunks:
+                                product_chunks[product_id] = []
+                            product_chunks[product_id].append(product_df)
+                    del chunk_results
+
+                    # --- WRITE STEP: WRITE CHUNKS EFFICIENTLY TO AVOID MEMORY EXHAUSTION ---
+                    # For large files (48M+ rows), a single concat can exhaust VRAM
+                    # Strategy: Write chunks iteratively, then merge if needed.
+                    # Partitions are independent, so products are encoded/flushed concurrently.
+                    with ThreadPoolExecutor(max_workers=max(1, min(8, len(product_chunks)))) as executor:
+                        list(executor.map(
+                            lambda item: write_level2_partition(
+                                output_path, date, item[0], item[1], compression, write_csv
+                            ),
+                            product_chunks.items()
+                        ))
+
+                    # Clean up
+                    del product_chunks, flattened_table
+            except Exception as e:
+                print(f"Error processing {jsonl_file.name}: {e}")
+                import traceback
+                traceback.print_exc()
+                had_error = True
+            finally:
+                file_elapsed = time.perf_counter() - file_start
+                if had_error:
+                    print(f"File time (error): {file_elapsed:.2f}s")
+                    continue
+                else:
+                    print(f"File time: {file_elapsed:.2f}s")
+                    print()
 
 
 def convert_ticker_data(
         input_dir: str,
         output_dir: str,
-        compression: str = "snappy",
+        compression: str = "zstd",
         skip_latest: bool = True,
         write_csv: bool = False
 ):
@@ -555,7 +1009,7 @@ def convert_ticker_data(
     output_path.mkdir(parents=True, exist_ok=True)
 
     # Find all ticker JSONL files, sorted by name
-    jsonl_files = sorted(input_path.glob("ticker_*.txt"))
+    jsonl_files = find_jsonl_files(input_path, "ticker")
 
     if not jsonl_files:
         print(f"No ticker JSONL files found in {input_dir}")
@@ -573,8 +1027,7 @@ def convert_ticker_data(
         print(f"Processing: {jsonl_file.name}\n")
 
         # Extract date from filename
-        date_str = jsonl_file.stem.split('_')[1]
-        date = datetime.strptime(date_str, '%Y%m%d').strftime('%Y-%m-%d')
+        date = jsonl_file_date(jsonl_file)
 
         monitor = GPUMemoryMonitor(f"Converting {jsonl_file.name}")
 
@@ -583,15 +1036,21 @@ def convert_ticker_data(
         had_error = False
         try:
             with monitor:
-                # Flatten nested JSON structure line-by-line
-                flattened_rows = []
+                # Flatten nested JSON structure line-by-line into a list
+                # pre-sized from a probe (slice assignment past the end
+                # still grows it if the estimate was low)
+                flattened_rows = [None] * estimate_ticker_rows(jsonl_file)
+                num_rows = 0
 
-                with open(jsonl_file, 'r') as f:
+                with open_jsonl(jsonl_file) as f:
                     for line in f:
                         if not line.strip():
                             continue
                         rows = flatten_ticker_line(line)
-                        flattened_rows.extend(rows)
+                        flattened_rows[num_rows:num_rows + len(rows)] = rows
+                        num_rows += len(rows)
+
+                del flattened_rows[num_rows:]
 
                 if not flattened_rows:
                     print(f"No valid data found in {jsonl_file.name}")
@@ -614,9 +1073,7 @@ def convert_ticker_data(
                     df['date'] = date
 
                     # Convert timestamps to datetime (handle mixed formats)
-                    import pandas as pd
-                    df_timestamp = df['timestamp'].to_pandas()
-                    df['timestamp'] = cudf.from_pandas(pd.to_datetime(df_timestamp, format='mixed', utc=True))
+                    df['timestamp'] = parse_iso_timestamps(df['timestamp'])
 
                     # Convert numeric columns
                     numeric_cols = [
@@ -626,13 +1083,12 @@ def convert_ticker_data(
                     ]
                     for col in numeric_cols:
                         if col in df.columns:
-                            df[col] = df[col].astype(float)
+                            df[col] = cudf.to_numeric(df[col], errors='coerce')
 
-                    df['sequence_num'] = df['sequence_num'].astype(int)
+                    df['sequence_num'] = df['sequence_num'].astype('int64')
 
                     # Write to Parquet with partitioning by date and product
-                    for product_id in df['product_id'].unique().to_pandas():
-                        product_df = df[df['product_id'] == product_id]
+                    for product_id, product_df in df.groupby('product_id', sort=False):
 
                         # Create partition directory
                         partition_dir = output_path / f"date={date}" / f"product_id={product_id}"
@@ -649,7 +1105,9 @@ def convert_ticker_data(
                             combined_df.to_parquet(
                                 output_file,
                                 compression=compression,
-                                index=False
+                                index=False,
+                                row_group_size_bytes=ROW_GROUP_SIZE_BYTES,
+                                max_page_size_bytes=MAX_PAGE_SIZE_BYTES
                             )
                             del existing_df, combined_df
                         else:
@@ -657,7 +1115,9 @@ def convert_ticker_data(
                             product_df.to_parquet(
                                 output_file,
                                 compression=compression,
-                                index=False
+                                index=False,
+                                row_group_size_bytes=ROW_GROUP_SIZE_BYTES,
+                                max_page_size_bytes=MAX_PAGE_SIZE_BYTES
                             )
 
                         # Track file for summary
@@ -665,9 +1125,8 @@ def convert_ticker_data(
                             product_files[product_id] = {'rows': 0, 'file': output_file}
                         product_files[product_id]['rows'] += len(product_df)
 
-                    # Free memory after each chunk
+                    # Release chunk buffers back to the pool
                     del df
-                    cp.get_default_memory_pool().free_all_blocks()
 
                 # Print summary
                 for product_id, info in product_files.items():
@@ -678,8 +1137,6 @@ def convert_ticker_data(
                     if write_csv:
                         csv_file = info['file'].with_suffix('.csv')
                         # Read Parquet and write CSV (memory-efficient via PyArrow)
-                        import pyarrow.parquet as pq
-                        import pyarrow.csv as pa_csv
                         table = pq.read_table(info['file'])
                         pa_csv.write_csv(
                             table,
@@ -691,7 +1148,6 @@ def convert_ticker_data(
 
                 # Clean up
                 del flattened_rows
-                cp.get_default_memory_pool().free_all_blocks()
         except Exception as e:
             print(f"Error processing {jsonl_file.name}: {e}")
             import traceback
@@ -704,6 +1160,53 @@ def convert_ticker_data(
             continue
 
 
+def parquet_uncompressed_bytes(metadata: pq.FileMetaData) -> int:
+    """Sum of uncompressed column chunk sizes recorded in a Parquet footer."""
+    return sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+
+
+def summarize_parquet_tree(root: Path) -> Dict[str, Any]:
+    """
+    File/row/size statistics for a Hive-partitioned Parquet tree.
+
+    All files are gathered into one pyarrow dataset and their footers are
+    read in parallel; no column chunk is decoded.
+    Dates come from the partition keys, not from the data.
+
+    Args:
+        root: Dataset root (e.g. parquet/level2)
+
+    Returns:
+        Dict with files, rows, size_bytes, raw_bytes, min_date, max_date
+    """
+    # Explicit file list: partitions may also hold optional data.csv files
+    files = [str(path) for path in sorted(Path(root).rglob("*.parquet"))]
+    dataset = ds.dataset(files, format="parquet", partitioning="hive",
+                         partition_base_dir=str(root))
+    fragments = list(dataset.get_fragments())
+
+    def footer_stats(fragment):
+        metadata = fragment.metadata
+        return metadata.num_rows, parquet_uncompressed_bytes(metadata)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(fragments)))) as executor:
+        stats = list(executor.map(footer_stats, fragments))
+
+    dates = sorted({
+        str(ds.get_partition_keys(fragment.partition_expression).get("date"))
+        for fragment in fragments
+    } - {"None"})
+
+    return {
+        "files": len(fragments),
+        "rows": sum(rows for rows, _ in stats),
+        "size_bytes": sum(os.path.getsize(fragment.path) for fragment in fragments),
+        "raw_bytes": sum(raw for _, raw in stats),
+        "min_date": dates[0] if dates else None,
+        "max_date": dates[-1] if dates else None,
+    }
+
+
 def validate_conversion(parquet_dir: str):
     """
     Validate converted Parquet files.
@@ -718,57 +1221,44 @@ def validate_conversion(parquet_dir: str):
 
     parquet_path = Path(parquet_dir)
 
-    # Check Level2 data
-    level2_dir = parquet_path / "level2"
-    if level2_dir.exists():
-        level2_files = list(level2_dir.rglob("*.parquet"))
-        print(f"Level2 Data:")
-        print(f"Files: {len(level2_files)}")
-
-        if level2_files:
-            # Count total rows
-            total_rows = 0
-            total_size = 0
-            for file in level2_files:
-                df = cudf.read_parquet(file)
-                total_rows += len(df)
-                total_size += file.stat().st_size
-
-            print(f"Total Rows: {total_rows:,}")
-            print(f"Total Size: {total_size / (1024 ** 2):.2f} MB")
-            print(f"Avg File Size: {total_size / len(level2_files) / (1024 ** 2):.2f} MB")
-    else:
-        print("Level2 Data: Not found")
+    for name, label in (("level2", "Level2"), ("ticker", "Ticker")):
+        data_dir = parquet_path / name
+        if not data_dir.exists():
+            print(f"{label} Data: Not found")
+            print()
+            continue
 
-    print()
+        summary = summarize_parquet_tree(data_dir)
+        print(f"{label} Data:")
+        print(f"Files: {summary['files']}")
 
-    # Check Ticker data
-    ticker_dir = parquet_path / "ticker"
-    if ticker_dir.exists():
-        ticker_files = list(ticker_dir.rglob("*.parquet"))
-        print(f"Ticker Data:")
-        print(f"Files: {len(ticker_files)}")
-
-        if ticker_files:
-            total_rows = 0
-            total_size = 0
-            for file in ticker_files:
-                df = cudf.read_parquet(file)
-                total_rows += len(df)
-                total_size += file.stat().st_size
-
-            print(f"Total Rows: {total_rows:,}")
+        if summary["files"]:
+            total_size = summary["size_bytes"]
+            raw_size = summary["raw_bytes"]
+            print(f"Total Rows: {summary['rows']:,}")
             print(f"Total Size: {total_size / (1024 ** 2):.2f} MB")
-            print(f"Avg File Size: {total_size / len(ticker_files) / (1024 ** 2):.2f} MB")
-    else:
-        print("Ticker Data: Not found")
+            print(f"Avg File Size: {total_size / summary['files'] / (1024 ** 2):.2f} MB")
+            if total_size:
+                print(f"Compression: {raw_size / total_size:.1f}x "
+                      f"({raw_size / (1024 ** 2):.2f} MB uncompressed)")
+            if summary["min_date"]:
+                print(f"Dates: {summary['min_date']} to {summary['max_date']}")
+        print()
 
-    print()
     print("Validation complete!")
 
 
-def main():
-    """Main entry point for JSONL → Parquet conversion."""
+def main(argv: List[str] = None) -> Path:
+    """
+    Main entry point for JSONL → Parquet conversion.
+
+    Args:
+        argv: Command-line arguments (None = sys.argv[1:]); lets
+            run_full_pipeline.py call the stage in-process
+
+    Returns:
+        Parquet root directory (level2/ and ticker/ live under it)
+    """
     parser = argparse.ArgumentParser(
         description="Convert JSONL websocket data to Parquet format (GPU-accelerated)"
     )
@@ -795,13 +1285,53 @@ def main():
         action="store_true",
         help="Validate existing Parquet files instead of converting"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parser processes per JSONL file (default: CPU count)"
+    )
+    parser.add_argument(
+        "--fixed-point-prices",
+        action="store_true",
+        help="Store level2 price_level/new_quantity as exact decimal64(18, 8) instead of float64"
+    )
+    parser.add_argument(
+        "--managed-memory",
+        action="store_true",
+        help="Back the RMM pool with CUDA managed memory (oversubscribe VRAM instead of OOM)"
+    )
+    parser.add_argument(
+        "--gpu-json",
+        action="store_true",
+        help="Parse level2 JSONL on the GPU with cudf.read_json (falls back to the CPU parser)"
+    )
     parser.add_argument(
         "--write-csv",
         action="store_true",
         help="Also write CSV files alongside Parquet (for Power BI compatibility)"
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    # One RMM pool for cuDF and CuPy (with the OOM-eviction callback that
+    # run_with_guardrails retries rely on), set up before the first
+    # allocation. A managed pool is left uncapped, so inputs larger than
+    # VRAM page to host instead of failing.
+    if ENABLE_GPU_MEMORY_POOL:
+        GPUMemoryManager(
+            limit_gb=None if args.managed_memory else GPU_MEMORY_LIMIT_GB,
+            use_rmm_pool=True,
+            use_managed=args.managed_memory
+        )
+
+    # Share buffers between derived frames/slices until one is modified
+    cudf.set_option("copy_on_write", True)
+
+    # Let single-chunk Parquet writes (and GPU JSON reads) go straight
+    # between VRAM and NVMe when GPUDirect Storage is available. libcudf
+    # reads the policy on first file I/O, so this must precede any read.
+    os.environ.setdefault("LIBCUDF_CUFILE_POLICY", CUFILE_POLICY)
 
     # Calculate skip_latest (opposite of include_latest)
     skip_latest = not args.include_latest
@@ -809,7 +1339,7 @@ def main():
     # Validation mode
     if args.validate:
         validate_conversion(str(PARQUET_LEVEL2_DIR.parent))
-        return
+        return PARQUET_LEVEL2_DIR.parent
 
     # Print header
     print("=" * 60)
@@ -834,7 +1364,10 @@ def main():
         output_dir=str(PARQUET_LEVEL2_DIR),
         compression=args.compression,
         skip_latest=skip_latest,
-        write_csv=args.write_csv
+        write_csv=args.write_csv,
+        num_workers=args.workers,
+        fixed_point_prices=args.fixed_point_prices,
+        gpu_json=args.gpu_json
     )
     level_elapsed = time.perf_counter() - level_start
     print(f"Level2 conversion time: {level_elapsed:.2f}s")
@@ -862,6 +1395,7 @@ def main():
 
     total_elapsed = time.perf_counter() - total_start
 
+    return PARQUET_LEVEL2_DIR.parent
 
 
 if __name__ == "__main__":
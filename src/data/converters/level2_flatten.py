@@ -0,0 +1,168 @@
+"""
+Level2 JSONL flattening for the CPU parser processes.
+
+Pure Python + pyarrow (no cuDF/CuPy/config imports), so the worker
+processes of read_level2_file() import only this module to unpickle
+parse_level2_slice instead of the whole GPU converter.
+"""
+
+import json
+import mmap
+from typing import Dict, Tuple
+
+import pyarrow as pa
+
+# Fast JSON parsing (SIMD-accelerated); fall back to stdlib if not installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so the error
+# handling in flatten_level2_line works for both.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
+# Flattened level2 columns and their Arrow types (raw strings; numeric and
+# datetime casts happen on the GPU after upload)
+LEVEL2_ARROW_TYPES = {
+    'timestamp': pa.string(),
+    'channel': pa.string(),
+    'sequence_num': pa.int64(),
+    'event_type': pa.string(),
+    'product_id': pa.string(),
+    'side': pa.string(),
+    'event_time': pa.string(),
+    'price_level': pa.string(),
+    'new_quantity': pa.string(),
+}
+
+
+def new_level2_columns() -> Dict[str, list]:
+    """Create empty per-column lists for flatten_level2_line."""
+    return {name: [] for name in LEVEL2_ARROW_TYPES}
+
+
+def level2_columns_to_arrow(columns: Dict[str, list]) -> pa.Table:
+    """Build a typed Arrow table from per-column lists (one H2D copy later)."""
+    return pa.table({
+        name: pa.array(columns[name], type=arrow_type)
+        for name, arrow_type in LEVEL2_ARROW_TYPES.items()
+    })
+
+
+def flatten_level2_line(line: str, columns: Dict[str, list]) -> int:
+    """
+    Flatten a single level2 JSONL line into multiple rows.
+
+    Input structure:
+    {
+        "channel": "l2_data",
+        "timestamp": "2025-11-07T09:59:01.328203255Z",
+        "sequence_num": 19,
+        "events": [{
+            "type": "update",
+            "product_id": "BTC-USD",
+            "updates": [
+                {
+                    "side": "bid",
+                    "event_time": "2025-11-07T09:59:00.692602Z",
+                    "price_level": "100877.72",
+                    "new_quantity": "0.00198"
+                }
+            ]
+        }]
+    }
+
+    Rows are appended column-wise (one value per update to each list in
+    `columns`, see new_level2_columns) instead of allocating a dict per row.
+
+    Returns: Number of rows appended
+    """
+    try:
+        data = _json_loads(line)
+
+        # Extract top-level metadata
+        timestamp = data.get('timestamp', '')
+        channel = data.get('channel', '')
+        sequence_num = data.get('sequence_num', 0)
+
+        timestamps = columns['timestamp']
+        channels = columns['channel']
+        sequence_nums = columns['sequence_num']
+        event_types = columns['event_type']
+        product_ids = columns['product_id']
+        sides = columns['side']
+        event_times = columns['event_time']
+        price_levels = columns['price_level']
+        new_quantities = columns['new_quantity']
+
+        num_rows = 0
+        for event in data.get('events', []):
+            event_type = event.get('type', '')
+            product_id = event.get('product_id', '')
+
+            for update in event.get('updates', []):
+                # Read all fields first so a bad update can't leave the
+                # column lists with different lengths
+                side = update.get('side', '')
+                event_time = update.get('event_time', '')
+                price_level = update.get('price_level', '')
+                new_quantity = update.get('new_quantity', '')
+
+                timestamps.append(timestamp)
+                channels.append(channel)
+                sequence_nums.append(sequence_num)
+                event_types.append(event_type)
+                product_ids.append(product_id)
+                sides.append(side)
+                event_times.append(event_time)
+                price_levels.append(price_level)
+                new_quantities.append(new_quantity)
+                num_rows += 1
+
+        return num_rows
+
+    except json.JSONDecodeError as e:
+        # Skip malformed JSON lines silently (common in streaming data)
+        return 0
+    except KeyError as e:
+        # Skip lines with missing required fields
+        print(f"Skipping line with missing field: {e}")
+        return 0
+    except Exception as e:
+        # Log unexpected errors but continue processing
+        print(f"Unexpected error flattening level2 line: {type(e).__name__}: {e}")
+        return 0
+
+
+def parse_level2_slice(path: str, start: int, end: int) -> Tuple[pa.Table, int, int]:
+    """
+    Flatten the level2 lines in one byte range of a JSONL file (worker process).
+
+    Returns:
+        (Arrow table, line count, malformed line count)
+    """
+    columns = new_level2_columns()
+    line_count = 0
+    error_count = 0
+
+    # Memory-map the file and hand raw bytes lines to the JSON parser (no
+    # per-line UTF-8 decode, no read buffer copies)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+
+        pos = start
+        while pos < end:
+            newline = mm.find(b'\n', pos, end)
+            if newline == -1:
+                newline = end
+            line = mm[pos:newline]
+            pos = newline + 1
+
+            if not line.strip():
+                continue
+            line_count += 1
+            if not flatten_level2_line(line, columns):  # Line had content but failed to parse
+                error_count += 1
+
+    return level2_columns_to_arrow(columns), line_count, error_count
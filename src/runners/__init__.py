@@ -0,0 +1 @@
+"""Process supervisors for long-running jobs"""
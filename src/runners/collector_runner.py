@@ -0,0 +1,147 @@
+"""
+Robust runner for 24/7 data collection with auto-restart on failures
+
+Shared by the run_collector_24x7.py entry points.
+"""
+import signal
+import sys
+import threading
+from datetime import datetime
+import os
+
+
+# Set by SIGINT/SIGTERM; wakes the restart backoff immediately
+_stop = threading.Event()
+# pid (== process group id) of the running collector, None between runs
+_child = None
+
+# Seconds the collector gets to flush after a stop request before its
+# process group is killed
+SHUTDOWN_GRACE_SECONDS = 10
+
+
+def _signal_group(pgid, sig):
+    """Send `sig` to the collector's process group (no-op once it is gone)"""
+    try:
+        os.killpg(pgid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _request_stop(signum, frame):
+    """Signal handler: stop restarting and let the collector shut down"""
+    _stop.set()
+    # The collector runs in its own process group, so terminal Ctrl+C doesn't
+    # reach it: forward SIGINT (the collector flushes on KeyboardInterrupt)
+    # and SIGKILL the whole group if it hasn't exited within the grace period
+    if _child is not None:
+        _signal_group(_child, signal.SIGINT)
+        killer = threading.Timer(SHUTDOWN_GRACE_SECONDS, _signal_group, args=(_child, signal.SIGKILL))
+        killer.daemon = True
+        killer.start()
+
+
+def run_with_restart(collector_path, *, max_failures=8, wait_time=5,
+                     restart_on_clean_exit=True):
+    """
+    Run the collector script with automatic restart on exit
+    
+    Args:
+        collector_path: Path to the collector script
+        max_failures: Stop after this many consecutive failed runs
+        wait_time: Seconds to wait before each restart
+        restart_on_clean_exit: Also restart when the collector exits with
+            code 0 (e.g. after a WebSocket disconnect)
+    """
+    global _child
+    consecutive_failures = 0
+    # Resolved once (symlinks included), not on every restart
+    collector_path = os.path.realpath(collector_path)
+    
+    # Run the collector with unbuffered output
+    # Set PYTHONUNBUFFERED to force unbuffered output
+    env = os.environ.copy()
+    env['PYTHONUNBUFFERED'] = '1'
+    if not os.access(os.path.dirname(collector_path), os.W_OK):
+        # Read-only checkout: don't attempt .pyc writes in the child
+        env['PYTHONDONTWRITEBYTECODE'] = '1'
+    
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+    
+    while not _stop.is_set():
+        try:
+            print(f"\n{'='*60}\nStarting data collector at {datetime.now()}\n{'='*60}\n")
+            
+            if not os.path.exists(collector_path):
+                print(f"ERROR: Collector script not found at: {collector_path}")
+                print(f"   Current working directory: {os.getcwd()}")
+                break
+            
+            # Child inherits our stdout/stderr: its output goes straight to
+            # the terminal/log with no read-decode-print relay in this process.
+            # Flush first so our banner isn't reordered after the child's output.
+            sys.stdout.flush()
+            # posix_spawn (vfork + exec) with its own process group, so
+            # anything the collector spawns can be signalled together and
+            # nothing is orphaned across restarts. subprocess.Popen only
+            # takes this path without a process group; here it is called
+            # directly. Only stdin/stdout/stderr are inheritable (PEP 446).
+            pid = _child = os.posix_spawn(
+                sys.executable,
+                [sys.executable, '-u', collector_path],
+                env,
+                setpgroup=0
+            )
+            
+            # Wait for process to complete
+            _, status = os.waitpid(pid, 0)
+            _child = None
+            return_code = os.waitstatus_to_exitcode(status)
+            # Clean up anything the collector left behind in its group
+            _signal_group(pid, signal.SIGTERM)
+            
+            if _stop.is_set():
+                break
+            
+            if return_code == 0 and not restart_on_clean_exit:
+                print(f"\nCollector exited cleanly")
+                break
+            
+            # Restart on any other exit (normal or crash)
+            # This handles WebSocket disconnections
+            consecutive_failures += 1
+            
+            if return_code == 0:
+                print(f"\nCollector stopped (WebSocket disconnect?)")
+            else:
+                print(f"\nCollector crashed (code {return_code})")
+            
+            print(f"Consecutive restarts: {consecutive_failures}/{max_failures}")
+            
+            if consecutive_failures >= max_failures:
+                print("\nToo many consecutive failures. Stopping.")
+                break
+            
+            # Wait before restart
+            print(f"Restarting in {wait_time} seconds...")
+            if _stop.wait(wait_time):
+                break
+            
+            # Reset failure counter on successful restart
+            consecutive_failures = 0
+                
+        except Exception as e:
+            consecutive_failures += 1
+            print(f"\nUnexpected error: {e}")
+            print(f"Consecutive failures: {consecutive_failures}/{max_failures}")
+            
+            if consecutive_failures >= max_failures:
+                print("\nToo many consecutive failures. Stopping.")
+                break
+            
+            if _stop.wait(wait_time):
+                break
+    
+    if _stop.is_set():
+        print("\n\nStopping data collection...")
@@ -7,9 +7,36 @@ Prevents OOM errors and optimizes memory usage.
 
 import cupy as cp
 import cudf
-from typing import Dict, Optional
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import gc
 
+# Byte-unit constants (bit shifts and reciprocals computed once at import)
+_GB = 1 << 30
+_INV_GB = 1.0 / _GB
+_INV_MB = 1.0 / (1 << 20)
+
+# Generation-1 collections between free_memory() calls that justify a full
+# (whole-heap) collection
+FULL_GC_THRESHOLD = 100
+
+
+def _evict_on_oom(nbytes: int) -> bool:
+    """
+    RMM allocation-failure callback: collect garbage, retry if it helped.
+    
+    Args:
+        nbytes: Size of the failed allocation
+    
+    Returns:
+        True to retry the allocation, False to raise MemoryError
+    """
+    # Unreachable DataFrames hold device buffers until the cycle collector
+    # runs; retrying only makes sense if it found something to free
+    return gc.collect() > 0
+
 
 class GPUMemoryManager:
     """
@@ -22,35 +49,94 @@ class GPUMemoryManager:
     - OOM prevention
     """
     
-    def __init__(self, limit_gb: Optional[float] = None):
+    def __init__(self, limit_gb: Optional[float] = None, use_rmm_pool: bool = False,
+                 initial_pool_gb: float = 16, use_managed: bool = False):
         """
         Initialize GPU memory manager.
         
         Args:
             limit_gb: Memory limit in GB (None = no limit)
+            use_rmm_pool: Route cuDF and CuPy through one shared RMM pool
+                (falls back to CuPy's default pool if rmm is not installed)
+            initial_pool_gb: RMM pool size reserved up front (capped at limit_gb)
+            use_managed: Back the RMM pool with CUDA managed memory so
+                oversubscription pages to host instead of raising OOM
+                (implies use_rmm_pool)
         """
         self.limit_gb = limit_gb
+        self._last_gc_count = gc.get_count()[2]
         self.mempool = cp.get_default_memory_pool()
         self.pinned_mempool = cp.get_default_pinned_memory_pool()
+        self.rmm_pool = (use_rmm_pool or use_managed) and self._init_rmm_pool(
+            limit_gb, initial_pool_gb, use_managed
+        )
         
-        if limit_gb:
+        if limit_gb and not self.rmm_pool:
             # Set memory limit
-            self.mempool.set_limit(size=int(limit_gb * 1024**3))
+            self.mempool.set_limit(size=int(limit_gb * _GB))
+    
+    @staticmethod
+    def _init_rmm_pool(limit_gb: Optional[float], initial_pool_gb: float,
+                       use_managed: bool = False) -> bool:
+        """Reinitialize RMM with a pool allocator and point CuPy at it."""
+        try:
+            import rmm
+            from rmm.allocators.cupy import rmm_cupy_allocator
+        except ImportError:
+            print("⚠️  rmm not installed, using CuPy default memory pool")
+            return False
+        
+        if limit_gb:
+            initial_pool_gb = min(initial_pool_gb, limit_gb)
+        rmm.reinitialize(
+            pool_allocator=True,
+            initial_pool_size=int(initial_pool_gb * _GB),
+            maximum_pool_size=int(limit_gb * _GB) if limit_gb else None,
+            managed_memory=use_managed
+        )
+        
+        # Prefetch managed allocations to the device on first use, so kernels
+        # don't page-fault them in (adaptor available in newer RMM releases)
+        if use_managed and hasattr(rmm.mr, 'PrefetchResourceAdaptor'):
+            rmm.mr.set_current_device_resource(
+                rmm.mr.PrefetchResourceAdaptor(rmm.mr.get_current_device_resource())
+            )
+        
+        # Evict only when an allocation actually fails, instead of trimming
+        # the pool preemptively
+        rmm.mr.set_current_device_resource(
+            rmm.mr.FailureCallbackResourceAdaptor(
+                rmm.mr.get_current_device_resource(), _evict_on_oom
+            )
+        )
+        cp.cuda.set_allocator(rmm_cupy_allocator)
+        return True
     
     def get_memory_info(self) -> Dict[str, float]:
         """
         Get current GPU memory usage.
         
+        Device figures come from cudaMemGetInfo, so they include the CUDA
+        context and every allocator (CuPy, RMM, cuDF, Numba); the CuPy pool
+        counters are reported separately.
+        
         Returns:
             Dictionary with memory statistics in GB
         """
+        device_free, device_total = cp.cuda.runtime.memGetInfo()
+        device_free_gb = device_free * _INV_GB
+        device_total_gb = device_total * _INV_GB
+        
         return {
-            'used_gb': self.mempool.used_bytes() / 1024**3,
-            'total_gb': self.mempool.total_bytes() / 1024**3,
-            'free_gb': (self.mempool.total_bytes() - self.mempool.used_bytes()) / 1024**3,
+            'used_gb': device_total_gb - device_free_gb,
+            'total_gb': device_total_gb,
+            'free_gb': device_free_gb,
+            'device_free_gb': device_free_gb,
+            'device_total_gb': device_total_gb,
+            'pool_used_gb': self.mempool.used_bytes() * _INV_GB,
+            'pool_reserved_gb': self.mempool.total_bytes() * _INV_GB,
             'limit_gb': self.limit_gb if self.limit_gb else float('inf'),
-            'usage_pct': (self.mempool.used_bytes() / self.mempool.total_bytes() * 100) 
-                         if self.mempool.total_bytes() > 0 else 0
+            'usage_pct': (device_total - device_free) / device_total * 100
         }
     
     def print_memory_usage(self) -> None:
@@ -65,16 +151,32 @@ class GPUMemoryManager:
         """
         Free GPU memory.
         
+        Runs a full (generation 2) garbage collection only when aggressive
+        or when more than FULL_GC_THRESHOLD generation-1 collections have
+        happened since the last call; otherwise a cheap young-generation
+        pass is enough to drop unreferenced DataFrames.
+        
         Args:
-            aggressive: If True, free all cached blocks (slower next allocation)
+            aggressive: If True, full collection and free all cached blocks
+                (slower next allocation, see trim_pool)
         """
-        gc.collect()  # Python garbage collection
+        now = gc.get_count()[2]
+        # The counter resets whenever the interpreter runs a full collection
+        # itself, in which case everything counted so far is new
+        delta = now - self._last_gc_count if now >= self._last_gc_count else now
+        if aggressive or delta > FULL_GC_THRESHOLD:
+            gc.collect()  # Full Python garbage collection
+        else:
+            gc.collect(1)
+        self._last_gc_count = gc.get_count()[2]
         
         if aggressive:
-            self.mempool.free_all_blocks()
-            self.pinned_mempool.free_all_blocks()
-        
-        cp.get_default_memory_pool().free_all_blocks()
+            self.trim_pool()
+    
+    def trim_pool(self) -> None:
+        """Return all cached (unused) device and pinned blocks to the driver."""
+        self.mempool.free_all_blocks()
+        self.pinned_mempool.free_all_blocks()
     
     def check_available(self, required_gb: float) -> bool:
         """
@@ -87,36 +189,110 @@ class GPUMemoryManager:
             True if enough memory available
         """
         info = self.get_memory_info()
-        available = info['free_gb']
+        available = info['device_free_gb']
         
         if self.limit_gb:
             available = min(available, self.limit_gb - info['used_gb'])
         
         return available >= required_gb
     
+    def run_with_guardrails(self, fn: Callable[[Any], Any], data: Sequence,
+                            n_cap: int = 1, itr: int = 1) -> List[Any]:
+        """
+        Apply `fn` to slices of `data`, backing off instead of failing on OOM.
+        
+        `data` is split into `itr` slices, processed `n_cap` at a time
+        (concurrently when n_cap > 1). When a batch raises an out-of-memory
+        error its partial results are dropped, memory is freed, and the
+        remaining data is retried with less concurrency (n_cap - 1) or, once
+        n_cap is 1, with smaller slices (itr + 1).
+        
+        Args:
+            fn: Function applied to each slice (must be safe to re-run)
+            data: Sliceable input (Arrow table, cuDF DataFrame, list, ...)
+            n_cap: Initial number of slices processed concurrently
+            itr: Initial number of slices
+        
+        Returns:
+            Results of `fn`, in slice order
+        
+        Example:
+            >>> manager = GPUMemoryManager()
+            >>> dfs = manager.run_with_guardrails(cudf.DataFrame.from_arrow, table, itr=4)
+        """
+        results = []
+        total = len(data)
+        start = 0
+        
+        while start < total:
+            slice_len = max(1, -(-total // itr))  # ceil(total / itr)
+            bounds = [
+                (pos, min(pos + slice_len, total))
+                for pos in range(start, min(total, start + slice_len * n_cap), slice_len)
+            ]
+            
+            try:
+                if len(bounds) > 1:
+                    with ThreadPoolExecutor(max_workers=len(bounds)) as executor:
+                        batch = list(executor.map(lambda b: fn(data[b[0]:b[1]]), bounds))
+                else:
+                    batch = [fn(data[lo:hi]) for lo, hi in bounds]
+            except MemoryError as e:  # Includes cupy OutOfMemoryError and RMM failures
+                self.free_memory(aggressive=True)
+                if n_cap > 1:
+                    n_cap -= 1
+                elif slice_len > 1:
+                    itr += 1
+                else:
+                    raise
+                print(f"⚠️  GPU OOM ({type(e).__name__}), retrying with "
+                      f"n_cap={n_cap}, itr={itr}")
+                continue
+            
+            results.extend(batch)
+            start = bounds[-1][1]
+        
+        return results
+    
     def estimate_dataframe_size(self, df: cudf.DataFrame) -> float:
         """
         Estimate DataFrame memory usage in GB.
         
+        Fixed-width columns are sized from dtype and length alone (no GPU
+        query; null masks, at most 1 bit per row, are ignored); only
+        variable-width columns (strings, lists, categoricals) fall back to
+        memory_usage(deep=True).
+        
         Args:
             df: cuDF DataFrame
         
         Returns:
             Estimated size in GB
         """
-        return df.memory_usage(deep=True).sum() / 1024**3
+        n_rows = len(df)
+        total = 0
+        for col, dtype in df.dtypes.items():
+            if getattr(dtype, 'kind', 'O') in 'biufmM':
+                total += dtype.itemsize * n_rows
+            else:
+                total += df[col].memory_usage(deep=True)
+        return total * _INV_GB
     
     def auto_free_if_needed(self, threshold_pct: float = 80) -> None:
         """
         Automatically free memory if usage exceeds threshold.
         
+        Only drops unreferenced Python objects; cached pool blocks stay warm
+        and are released on real allocation failure (CuPy retries after
+        freeing its cache, the RMM pool via _evict_on_oom).
+        
         Args:
             threshold_pct: Trigger threshold (0-100)
         """
         info = self.get_memory_info()
         if info['usage_pct'] > threshold_pct:
-            print(f"⚠️  GPU memory {info['usage_pct']:.1f}% used, freeing cached blocks...")
-            self.free_memory(aggressive=True)
+            print(f"⚠️  GPU memory {info['usage_pct']:.1f}% used, collecting garbage...")
+            self.free_memory()
             info = self.get_memory_info()
             print(f"   ✓ After cleanup: {info['usage_pct']:.1f}% used")
 
@@ -161,57 +337,106 @@ class GPUMemoryMonitor:
         print(f"Delta:        {delta:+.2f} GB")
         print(f"{'='*60}\n")
         
-        # Auto-cleanup if usage high
+        # Auto-cleanup if usage high (keep the pool's cached blocks)
         if end_memory['usage_pct'] > 80:
             print("⚠️  High memory usage, running cleanup...")
-            self.manager.free_memory(aggressive=True)
+            self.manager.free_memory()
 
 
-def optimize_dataframe_memory(df: cudf.DataFrame, verbose: bool = True) -> cudf.DataFrame:
+# Narrowest-first integer tiers tried by optimize_dataframe_memory
+_INT_TIERS = [(dtype, np.iinfo(dtype)) for dtype in ('int8', 'int16', 'int32')]
+_INT_SOURCE_DTYPES = (np.dtype('int64'), np.dtype('int32'), np.dtype('int16'))
+
+
+def optimize_dataframe_memory(df: cudf.DataFrame, verbose: bool = True,
+                              float_dtype: str = 'float32') -> cudf.DataFrame:
     """
     Optimize DataFrame memory usage by downcasting numeric types.
     
+    Integer columns get the narrowest of int8/int16/int32 that holds their
+    min/max; float64 columns become `float_dtype`.
+    
     Args:
         df: cuDF DataFrame
         verbose: Print memory savings
+        float_dtype: Target for float64 columns ('float32', or 'float64'
+            to leave them as they are)
     
     Returns:
         Optimized DataFrame
+    
+    Raises:
+        ValueError: If float_dtype is not 'float32' or 'float64' (cuDF has
+            no half-precision columns)
     """
+    if float_dtype not in ('float32', 'float64'):
+        raise ValueError(f"float_dtype must be 'float32' or 'float64', got {float_dtype!r}")
+    
     if verbose:
-        start_mem = df.memory_usage(deep=True).sum() / 1024**2
+        start_mem = df.memory_usage(deep=True).sum() * _INV_MB
         print(f"Memory usage before: {start_mem:.2f} MB")
     
-    # Downcast integers
-    for col in df.select_dtypes(include=['int64']).columns:
-        df[col] = df[col].astype('int32')
+    # Build one {column: dtype} map and cast in a single astype call
+    dtype_map = {}
+    
+    # Downcast integers to the narrowest tier their values fit in (min/max
+    # of all int columns come from one reduction each, not one per column)
+    # One pass over df.dtypes (select_dtypes builds a throwaway DataFrame)
+    int_cols = [col for col, dtype in df.dtypes.items() if dtype in _INT_SOURCE_DTYPES]
+    float_cols = [col for col, dtype in df.dtypes.items() if dtype == np.float64]
+    if int_cols:
+        col_min = df[int_cols].min().to_pandas()
+        col_max = df[int_cols].max().to_pandas()
+        # All-null columns have no min/max to compare against
+        no_range = col_min.isna() | col_max.isna()
+        for col in int_cols:
+            if no_range[col]:
+                continue
+            for dtype, bounds in _INT_TIERS:
+                if col_min[col] >= bounds.min and col_max[col] <= bounds.max:
+                    if df[col].dtype.itemsize > bounds.bits // 8:
+                        dtype_map[col] = dtype
+                    break
     
     # Downcast floats
-    for col in df.select_dtypes(include=['float64']).columns:
-        df[col] = df[col].astype('float32')
+    if float_dtype != 'float64':
+        dtype_map.update({col: float_dtype for col in float_cols})
+    
+    if dtype_map:
+        df = df.astype(dtype_map, copy=False)
     
     if verbose:
-        end_mem = df.memory_usage(deep=True).sum() / 1024**2
+        end_mem = df.memory_usage(deep=True).sum() * _INV_MB
         print(f"Memory usage after:  {end_mem:.2f} MB")
         print(f"Savings: {start_mem - end_mem:.2f} MB ({(1 - end_mem/start_mem)*100:.1f}%)")
     
     return df
 
 
-def get_gpu_device_info() -> Dict:
+def get_gpu_device_info(device_id: Optional[int] = None) -> Dict:
     """
     Get GPU device information.
     
+    Args:
+        device_id: CUDA device ordinal (None = current device)
+    
     Returns:
         Dictionary with GPU properties
     """
-    device_id = cp.cuda.runtime.getDevice()
+    if device_id is None:
+        device_id = cp.cuda.runtime.getDevice()
+    return dict(_device_properties(device_id))
+
+
+@functools.lru_cache(maxsize=None)
+def _device_properties(device_id: int) -> Dict:
+    """Query device properties once per device (they never change)."""
     props = cp.cuda.runtime.getDeviceProperties(device_id)
     
     return {
         'device_id': device_id,
         'name': props['name'].decode(),
-        'total_memory_gb': props['totalGlobalMem'] / 1024**3,
+        'total_memory_gb': props['totalGlobalMem'] * _INV_GB,
         'compute_capability': f"{props['major']}.{props['minor']}",
         'multiprocessor_count': props['multiProcessorCount'],
         'clock_rate_mhz': props['clockRate'] / 1000,
@@ -229,8 +454,7 @@ def print_gpu_info():
     print(f"\nNumber of GPUs: {num_devices}")
     
     for i in range(num_devices):
-        cp.cuda.runtime.setDevice(i)
-        info = get_gpu_device_info()
+        info = get_gpu_device_info(i)
         
         print(f"\n📊 GPU {i}:")
         print(f"  Name:              {info['name']}")
@@ -259,12 +483,12 @@ if __name__ == '__main__':
     # Test memory monitor
     print("\n2. Testing memory monitor...")
     with GPUMemoryMonitor("Creating test DataFrame"):
-        # Create large DataFrame
-        df = cudf.DataFrame({
-            'a': cp.random.randn(10_000_000),
-            'b': cp.random.randn(10_000_000),
-            'c': cp.random.randn(10_000_000)
-        })
+        # Create large DataFrame from one preallocated scratch buffer
+        # (filled in place, one pool allocation instead of three)
+        n_rows = 10_000_000
+        buf = cp.empty((3, n_rows), dtype=cp.float64)
+        cp.random.default_rng().standard_normal(size=(3, n_rows), out=buf)
+        df = cudf.DataFrame({'a': buf[0], 'b': buf[1], 'c': buf[2]})
         print(f"   Created DataFrame: {len(df):,} rows")
         
         size_gb = manager.estimate_dataframe_size(df)
@@ -277,7 +501,7 @@ if __name__ == '__main__':
     
     # Cleanup
     print("\n4. Testing cleanup...")
-    del df, df_int, df_optimized
+    del buf, df, df_int, df_optimized
     manager.free_memory(aggressive=True)
     manager.print_memory_usage()
     
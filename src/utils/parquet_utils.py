@@ -5,13 +5,44 @@ Helper functions for reading/writing Parquet files with GPU optimization.
 Includes lazy loading, partition management, and schema validation.
 """
 
+import io
+import json
+import os
+import re
+import sys
 import cudf
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import List, Union, Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 import pyarrow.parquet as pq
-from datetime import datetime, timedelta
+
+# Add project root to path (for config when run directly)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from config.gpu_config import (
+    COMPRESSION, COMPRESSION_LEVEL, PARTITION_SCHEMA, ROW_GROUP_SIZE_BYTES,
+    MAX_PAGE_SIZE_BYTES, NUM_WORKERS, get_gandiva_filter, get_parquet_filters,
+    validate_filters
+)
+
+# date=<d>/ and optional product=<p>/ (or product_id=<p>/) in a relative path
+_PARTITION_RE = re.compile(r'^date=([^/\n]+)/(?:product(?:_id)?=([^/\n]+)/)?', re.MULTILINE)
+
+
+def _filter_key(filters: List[tuple]) -> tuple:
+    """Hashable form of (column, op, value) filters for get_gandiva_filter's cache."""
+    return tuple(
+        (col, op, tuple(val) if isinstance(val, (list, set)) else val)
+        for col, op, val in filters
+    )
 
 
 class ParquetManager:
@@ -26,7 +57,7 @@ class ParquetManager:
     - Schema validation
     """
     
-    def __init__(self, base_dir: Path, compression: str = 'snappy'):
+    def __init__(self, base_dir: Path, compression: str = COMPRESSION):
         """
         Initialize Parquet manager.
         
@@ -37,6 +68,12 @@ class ParquetManager:
         self.base_dir = Path(base_dir)
         self.compression = compression
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        # Directory listing cache for get_statistics(), persisted between runs.
+        # It lives in its own '_'-prefixed subdirectory: Parquet dataset
+        # readers and the scan skip it, and rewriting it never touches
+        # base_dir's mtime
+        self._manifest_path = self.base_dir / '_manifest' / 'listing.json'
+        self._manifest = None
     
     def write_partitioned(self, df: cudf.DataFrame, partition_cols: List[str], 
                           append: bool = True) -> None:
@@ -53,20 +90,127 @@ class ParquetManager:
             >>> manager.write_partitioned(df, ['date', 'product_id'])
             # Creates: date=2025-11-07/product=BTC-USD/data.parquet
         """
-        # Convert to pandas for pyarrow compatibility
-        df_pandas = df.to_pandas()
-        
-        # Create PyArrow table
-        table = pa.Table.from_pandas(df_pandas)
+        if not append and self._first_parquet_file() is not None:
+            raise FileExistsError(f"{self.base_dir} already contains Parquet data (append=False)")
         
-        # Write with partitioning
-        pq.write_to_dataset(
-            table,
-            root_path=str(self.base_dir),
+        # Written straight from device memory: no to_pandas()/Arrow rebuild
+        df.to_parquet(
+            str(self.base_dir),
             partition_cols=partition_cols,
             compression=self.compression,
-            existing_data_behavior='overwrite_or_ignore' if append else 'error'
+            index=False,
+            row_group_size_bytes=ROW_GROUP_SIZE_BYTES,
+            max_page_size_bytes=MAX_PAGE_SIZE_BYTES
+        )
+    
+    def compact_partition(self, date: str) -> int:
+        """
+        Merge the shards of each partition under a date into one file.
+        
+        Chunked writes leave one small file per chunk in every partition;
+        rewriting them as a single data.parquet gives downstream reads full
+        size row groups and one footer per partition. Shards are streamed
+        through the host in row-group-sized batches, never read whole.
+        
+        Args:
+            date: Date string (YYYY-MM-DD)
+        
+        Returns:
+            Number of shard files replaced
+        
+        Example:
+            >>> manager.compact_partition('2025-11-07')
+            # date=2025-11-07/product_id=BTC-USD/{a,b,c}.parquet -> data.parquet
+        """
+        date_dir = self.base_dir / f"date={date}"
+        if not date_dir.exists():
+            print(f"⚠️  Warning: {date_dir} does not exist")
+            return 0
+        
+        replaced = 0
+        for partition_dir in [date_dir, *(d for d in date_dir.rglob('*') if d.is_dir())]:
+            replaced += self._compact_dir(partition_dir)
+        
+        return replaced
+    
+    def _compact_dir(self, partition_dir: Path) -> int:
+        """
+        Merge the Parquet shards in one partition directory into data.parquet.
+        
+        Shards are streamed on the host in record batches and written out in
+        row groups of about ROW_GROUP_SIZE_BYTES, so at most one row group
+        is buffered at a time (nothing is loaded onto the GPU). Rows keep
+        their write order, and every batch is cast to one schema unified
+        from the shard footers.
+        
+        Args:
+            partition_dir: Leaf partition directory
+        
+        Returns:
+            Number of shard files replaced (0 if there was nothing to merge)
+        """
+        # Write order: an earlier data.parquet first, then shards by mtime
+        # (cuDF names shards by uuid, so name order is arbitrary)
+        shards = sorted(
+            partition_dir.glob('*.parquet'),
+            key=lambda f: (f.name != 'data.parquet', f.stat().st_mtime_ns, f.name)
+        )
+        if len(shards) < 2:
+            return 0
+        
+        # One output schema from the footers: shards written before a dtype
+        # change (e.g. int64 next to float64) are promoted, not rejected
+        schemas = [pq.read_schema(shard) for shard in shards]
+        try:
+            schema = pa.unify_schemas(schemas, promote_options='permissive')
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            schema = schemas[0]
+        
+        # '_'-prefixed until the shards are gone, so readers never see both
+        tmp_path = partition_dir / '_compacted.parquet'
+        writer = pq.ParquetWriter(
+            tmp_path, schema,
+            compression=self.compression,
+            compression_level=COMPRESSION_LEVEL if self.compression == 'zstd' else None,
+            data_page_size=MAX_PAGE_SIZE_BYTES
         )
+        pending, pending_bytes, num_rows = [], 0, 0
+        
+        def flush():
+            table = pa.concat_tables(pending)
+            writer.write_table(table, row_group_size=table.num_rows)
+        
+        try:
+            for shard in shards:
+                with pq.ParquetFile(shard) as parquet_file:
+                    for batch in parquet_file.iter_batches():
+                        # Cast as read, so the buffered batches always concat
+                        table = pa.Table.from_batches([batch])
+                        if table.schema != schema:
+                            table = table.select(schema.names).cast(schema)
+                        pending.append(table)
+                        pending_bytes += batch.nbytes
+                        num_rows += batch.num_rows
+                        if pending_bytes >= ROW_GROUP_SIZE_BYTES:
+                            flush()
+                            pending, pending_bytes = [], 0
+            if pending:
+                flush()
+        except BaseException:
+            writer.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        writer.close()
+        if not num_rows:
+            # Only empty shards: nothing worth replacing them with
+            tmp_path.unlink()
+            return 0
+        
+        for f in shards:
+            f.unlink()
+        os.replace(tmp_path, partition_dir / 'data.parquet')
+        return len(shards)
     
     def read_lazy(self, columns: Optional[List[str]] = None,
                   filters: Optional[List[tuple]] = None,
@@ -77,7 +221,7 @@ class ParquetManager:
         
         Args:
             columns: Columns to load (None = all)
-            filters: PyArrow filters for predicate pushdown
+            filters: (column, op, value) filters for predicate pushdown
             date_range: Tuple of (start_date, end_date) strings
             product: Product ID to filter
         
@@ -92,25 +236,31 @@ class ParquetManager:
             ... )
             # Only loads BTC-USD data from Nov 1-15, only 2 columns
         """
-        # Build filters
-        filter_list = []
-        if date_range:
-            start, end = date_range
-            filter_list.append(('date', '>=', start))
-            filter_list.append(('date', '<=', end))
-        if product:
-            filter_list.append(('product_id', '==', product))
-        if filters:
-            filter_list.extend(filters)
-        
-        # Read with filters (partition pruning happens here!)
-        df = cudf.read_parquet(
-            str(self.base_dir),
-            columns=columns,
-            filters=filter_list if filter_list else None
+        # Partition keys and row-group statistics prune before any decode
+        dataset = ds.dataset(
+            self.base_dir,
+            format='parquet',
+            partitioning=ds.HivePartitioning(PARTITION_SCHEMA)
         )
         
-        return df
+        start, end = date_range if date_range else (None, None)
+        filters = (get_parquet_filters(start, end, product) or []) + list(filters or [])
+        # Logs a warning for any filter column pyarrow can't push down
+        validate_filters(filters, dataset)
+        # Typed against the dataset schema and cached across scans
+        expr = get_gandiva_filter(dataset.schema, _filter_key(filters))
+        
+        # One host table, one host-to-device copy (concatenating per-batch
+        # cuDF frames would briefly hold the result twice on the GPU)
+        table = dataset.to_table(columns=columns, filter=expr, batch_size=1_000_000)
+        
+        # 'date' is typed date32 only for pruning; callers get the same
+        # 'YYYY-MM-DD' strings as the date= directory names
+        idx = table.schema.get_field_index('date')
+        if idx >= 0 and not pa.types.is_string(table.schema.field(idx).type):
+            table = table.set_column(idx, 'date', pc.cast(table.column(idx), pa.string()))
+        
+        return cudf.DataFrame.from_arrow(table)
     
     def read_date(self, date: str, product: Optional[str] = None,
                   columns: Optional[List[str]] = None) -> cudf.DataFrame:
@@ -161,6 +311,9 @@ class ParquetManager:
         """
         Stream read data one day at a time (generator).
         
+        The next day is read on a background thread while the caller works
+        on the current one, so at most two days are held in memory.
+        
         Yields:
             (date, DataFrame) tuples
         
@@ -170,18 +323,120 @@ class ParquetManager:
             ...     del df       # Free memory
         """
         start, end = date_range
-        start_dt = datetime.strptime(start, '%Y-%m-%d')
-        end_dt = datetime.strptime(end, '%Y-%m-%d')
+        # One listing of the date partitions instead of an exists() probe
+        # (and a warning) per day in the range
+        with os.scandir(self.base_dir) as it:
+            existing = {e.name[5:] for e in it if e.name.startswith('date=')}
+        dates = [
+            d for d in pd.date_range(start, end, freq='D').strftime('%Y-%m-%d')
+            if d in existing
+        ]
+        if not dates:
+            return
+        
+        reader = ThreadPoolExecutor(max_workers=1)
+        try:
+            pending = reader.submit(self.read_date, dates[0], product, columns)
+            for i, date_str in enumerate(dates):
+                df = pending.result()
+                # One-deep prefetch: the next read overlaps the caller's work
+                if i + 1 < len(dates):
+                    pending = reader.submit(self.read_date, dates[i + 1], product, columns)
+                
+                if len(df) > 0:
+                    yield date_str, df
+                del df
+        finally:
+            # Early exit from the loop: drop a prefetch that hasn't started
+            reader.shutdown(cancel_futures=True)
+    
+    def _scan_parquet_files(self) -> Dict[str, int]:
+        """
+        List every Parquet file under base_dir with its size.
+        
+        A directory whose mtime is unchanged since the last scan has the
+        same entries, so its cached listing is reused and only its files are
+        re-stat'ed; changed directories are re-listed. Each file is keyed on
+        (size, mtime_ns), which also catches shards overwritten in place.
+        The result is saved to the manifest under _manifest/.
         
-        current = start_dt
-        while current <= end_dt:
-            date_str = current.strftime('%Y-%m-%d')
-            df = self.read_date(date_str, product=product, columns=columns)
+        Returns:
+            Dict of {relative path: size in bytes}
+        """
+        if self._manifest is None:
+            try:
+                with open(self._manifest_path) as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError):
+                self._manifest = {}
+        
+        cached = self._manifest
+        manifest = {}
+        file_sizes = {}
+        stack = ['']
+        while stack:
+            rel_dir = stack.pop()
+            directory = os.path.join(self.base_dir, rel_dir)
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                continue
             
-            if len(df) > 0:
-                yield date_str, df
+            entry = cached.get(rel_dir)
+            if entry is not None and entry['mtime_ns'] == mtime_ns:
+                # Same listing: re-stat the known files only
+                files = {}
+                for name in entry['files']:
+                    try:
+                        st = os.stat(os.path.join(directory, name))
+                    except FileNotFoundError:
+                        continue
+                    files[name] = [st.st_size, st.st_mtime_ns]
+                entry = {'mtime_ns': mtime_ns, 'subdirs': entry['subdirs'], 'files': files}
+            else:
+                subdirs, files = [], {}
+                with os.scandir(directory) as it:
+                    for e in it:
+                        if e.name.startswith(('_', '.')):
+                            continue  # Manifest and other non-data entries
+                        if e.is_dir():
+                            subdirs.append(e.name)
+                        elif e.name.endswith('.parquet'):
+                            st = e.stat()
+                            files[e.name] = [st.st_size, st.st_mtime_ns]
+                entry = {'mtime_ns': mtime_ns, 'subdirs': subdirs, 'files': files}
             
-            current += timedelta(days=1)
+            manifest[rel_dir] = entry
+            for name, (size, _) in entry['files'].items():
+                file_sizes[os.path.join(rel_dir, name)] = size
+            stack.extend(os.path.join(rel_dir, d) for d in entry['subdirs'])
+        
+        if manifest != cached:
+            self._manifest = manifest
+            try:
+                self._manifest_path.parent.mkdir(exist_ok=True)
+                tmp_path = self._manifest_path.with_suffix('.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump(manifest, f)
+                os.replace(tmp_path, self._manifest_path)
+            except OSError:
+                pass  # Read-only dataset: keep the in-memory copy only
+        
+        return file_sizes
+    
+    def _first_parquet_file(self) -> Optional[str]:
+        """Path of any one Parquet file (scandir down the partition levels, stops at the first hit)."""
+        stack = [str(self.base_dir)]
+        while stack:
+            subdirs = []
+            with os.scandir(stack.pop()) as it:
+                for e in it:
+                    if e.name.endswith('.parquet') and e.is_file():
+                        return e.path
+                    if e.is_dir():
+                        subdirs.append(e.path)
+            stack.extend(subdirs)
+        return None
     
     def get_statistics(self) -> Dict:
         """
@@ -190,24 +445,18 @@ class ParquetManager:
         Returns:
             Dictionary with file count, total size, partitions, etc.
         """
-        parquet_files = list(self.base_dir.rglob('*.parquet'))
-        
-        total_size_mb = sum(f.stat().st_size for f in parquet_files) / 1024**2
+        file_sizes = self._scan_parquet_files()
         
-        # Extract unique dates and products from partition paths
-        dates = set()
-        products = set()
+        total_size_mb = sum(file_sizes.values()) / 1024**2
         
-        for f in parquet_files:
-            parts = f.parts
-            for part in parts:
-                if part.startswith('date='):
-                    dates.add(part.split('=')[1])
-                elif part.startswith('product='):
-                    products.add(part.split('=')[1])
+        # Extract unique dates and products from partition paths (one regex
+        # pass over all paths instead of a Python loop over every part)
+        matches = _PARTITION_RE.findall('\n'.join(file_sizes))
+        dates = {m[0] for m in matches}
+        products = {m[1] for m in matches if m[1]}
         
         return {
-            'num_files': len(parquet_files),
+            'num_files': len(file_sizes),
             'total_size_mb': total_size_mb,
             'num_dates': len(dates),
             'num_products': len(products),
@@ -226,20 +475,32 @@ class ParquetManager:
             True if schema matches, False otherwise
         """
         # Read a small sample
-        sample_files = list(self.base_dir.rglob('*.parquet'))[:1]
-        if not sample_files:
+        sample_file = self._first_parquet_file()
+        if sample_file is None:
             print("⚠️  No Parquet files found")
             return False
         
-        df = cudf.read_parquet(str(sample_files[0]), nrows=1)
+        # Footer only: schema without any GPU read or page decode
+        schema = pq.ParquetFile(sample_file).schema_arrow
+        actual_dtypes = {}
+        for field in schema:
+            try:
+                actual_dtypes[field.name] = str(np.dtype(field.type.to_pandas_dtype()))
+            except (NotImplementedError, TypeError):
+                actual_dtypes[field.name] = str(field.type)
+        # Partition keys live in the path, not the file, and are strings
+        rel_dir = os.path.relpath(os.path.dirname(sample_file), self.base_dir)
+        for part in rel_dir.split(os.sep):
+            if '=' in part:
+                actual_dtypes.setdefault(part.split('=')[0], 'object')
         
         # Check columns
         for col, expected_dtype in expected_schema.items():
-            if col not in df.columns:
+            if col not in actual_dtypes:
                 print(f"❌ Missing column: {col}")
                 return False
             
-            actual_dtype = str(df[col].dtype)
+            actual_dtype = actual_dtypes[col]
             if expected_dtype not in actual_dtype:
                 print(f"❌ Schema mismatch: {col} is {actual_dtype}, expected {expected_dtype}")
                 return False
@@ -248,19 +509,162 @@ class ParquetManager:
         return True
 
 
+# Bytes read from the head of each CSV to learn its header, dtypes and
+# average row width (used to turn chunk_size rows into a byte range)
+CSV_PROBE_BYTES = 1 << 20
+
+
+def _probe_csv(csv_file: Path) -> tuple:
+    """
+    Read the first CSV_PROBE_BYTES of a CSV to size and type its chunks.
+    
+    Args:
+        csv_file: CSV file path
+    
+    Returns:
+        (names, dtypes, bytes_per_row): column names, column dtypes inferred
+        from the sample (pinned for every chunk so widths never drift), and
+        the average row width in bytes. Integer columns other than the
+        timestamp are widened to float64, since a value past the sample may
+        be fractional
+    """
+    with open(csv_file, 'rb') as f:
+        head = f.read(CSV_PROBE_BYTES)
+    # Only whole rows: cut at the last newline in the sample
+    head = head[:head.rfind(b'\n') + 1] or head
+    header_len = head.find(b'\n') + 1
+    
+    probe = cudf.read_csv(io.BytesIO(head))
+    names = list(probe.columns)
+    dtypes = {col: str(probe[col].dtype) for col in names}
+    for col, dtype in dtypes.items():
+        if col != 'timestamp' and dtype.startswith(('int', 'uint')):
+            dtypes[col] = 'float64'
+    bytes_per_row = max((len(head) - header_len) / max(len(probe), 1), 1.0)
+    
+    return names, dtypes, bytes_per_row
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _add_partition_columns(df: cudf.DataFrame) -> cudf.DataFrame:
+    """Derive 'datetime' and the 'date' partition column if missing."""
+    if 'datetime' not in df.columns and 'timestamp' in df.columns:
+        # Convert timestamp to datetime
+        try:
+            df['timestamp'] = df['timestamp'].astype('int64')
+            df['datetime'] = df['timestamp'].astype('datetime64[s]')
+        except:
+            # String timestamps
+            df['datetime'] = cudf.to_datetime(df['timestamp'])
+    
+    # Add date column for partitioning: integer day buckets on the GPU, and
+    # only the few distinct days formatted on the host (no per-row strftime)
+    if 'date' not in df.columns:
+        days = (df['datetime'].astype('datetime64[s]').astype('int64') // 86_400).astype('int32')
+        day_names = {
+            day: (_EPOCH + timedelta(days=day)).strftime('%Y-%m-%d')
+            for day in days.unique().to_arrow().to_pylist()
+        }
+        df['date'] = days.map(day_names)
+    
+    return df
+
+
+def _read_csv_chunks(csv_file: Path, chunk_size: int,
+                     columns: Optional[List[str]] = None,
+                     partition_cols: Optional[List[str]] = None,
+                     num_readers: int = NUM_WORKERS):
+    """
+    Read a CSV in byte ranges of about `chunk_size` rows (generator).
+    
+    Each chunk is split into `num_readers` equal sub-ranges read by parallel
+    threads and concatenated on the GPU, so one file keeps several reads in
+    flight instead of one. With `columns`, only those columns (plus the
+    partition keys and the time columns they are derived from, of the ones
+    present in the file) are parsed and copied to the device.
+    
+    Yields:
+        cuDF DataFrame per non-empty chunk, with partition columns added
+    """
+    names, dtypes, bytes_per_row = _probe_csv(csv_file)
+    # Partition keys always stay, and so do the time columns 'date' is
+    # derived from
+    keep = set(columns or ()) | set(partition_cols or ()) | {'timestamp', 'datetime', 'date'}
+    usecols = [col for col in names if col in keep] if columns else None
+    if usecols:
+        dtypes = {col: dtypes[col] for col in usecols}
+    # Every chunk is num_readers sub-ranges of part_bytes starting at its own
+    # offset, so the sub-ranges tile the file with no overlap (also after
+    # part_bytes shrinks on OOM)
+    part_bytes = max(int(chunk_size * bytes_per_row) // num_readers, CSV_PROBE_BYTES)
+    file_size = csv_file.stat().st_size
+    
+    def read_range(offset, size):
+        # Rows that start inside the range are read (cuDF finishes the
+        # last one past the end); the header only sits in the first range
+        return cudf.read_csv(
+            csv_file,
+            byte_range=(offset, size),
+            header=0 if offset == 0 else None,
+            names=names,
+            usecols=usecols,
+            dtype=dtypes
+        )
+    
+    with ThreadPoolExecutor(max_workers=num_readers) as pool:
+        offset = 0
+        while offset < file_size:
+            chunk_end = min(offset + part_bytes * num_readers, file_size)
+            try:
+                offsets = range(offset, chunk_end, part_bytes)
+                parts = [
+                    part for part in pool.map(read_range, offsets, [part_bytes] * len(offsets))
+                    if len(part) > 0
+                ]
+                df = None
+                if parts:
+                    df = parts[0] if len(parts) == 1 else cudf.concat(parts, ignore_index=True)
+                    del parts
+                    df = _add_partition_columns(df)
+            except MemoryError:
+                # Retry the same range with half-size reads; the smaller size
+                # is kept for the rest of the file
+                parts = df = None
+                if part_bytes <= CSV_PROBE_BYTES:
+                    raise
+                part_bytes = max(part_bytes // 2, CSV_PROBE_BYTES)
+                print(f"   ⚠️  GPU out of memory, retrying with "
+                      f"{part_bytes * num_readers / 1024**2:.0f} MB chunks")
+                continue
+            
+            offset = chunk_end
+            if df is not None:
+                yield df
+                del df
+
+
 def csv_to_parquet_batch(csv_files: List[Path], output_dir: Path,
                           partition_cols: List[str],
-                          compression: str = 'snappy',
-                          chunk_size: int = 10_000_000) -> None:
+                          compression: str = COMPRESSION,
+                          chunk_size: int = 10_000_000,
+                          columns: Optional[List[str]] = None) -> None:
     """
     Convert multiple CSV files to partitioned Parquet format (GPU-accelerated).
     
+    Each file is read in byte ranges of about `chunk_size` rows, and each
+    chunk is written on a background thread while the next one is read, so
+    at most two chunks are resident on the GPU, never a whole file.
+    
     Args:
         csv_files: List of CSV file paths
         output_dir: Output directory for Parquet files
         partition_cols: Columns to partition by
         compression: Compression codec
         chunk_size: Rows to process at once
+        columns: Columns to load (None = all; partition_cols and the time
+            columns the date key is derived from are always kept)
     
     Example:
         >>> csv_files = list(Path('datasets/raw_csv').glob('level2_*.csv'))
@@ -273,36 +677,48 @@ def csv_to_parquet_batch(csv_files: List[Path], output_dir: Path,
     manager = ParquetManager(output_dir, compression=compression)
     
     total_rows = 0
-    for csv_file in csv_files:
-        print(f"\n📂 Converting {csv_file.name}...")
-        
-        # Read CSV to GPU (cuDF is fast!)
-        df = cudf.read_csv(csv_file)
-        total_rows += len(df)
-        
-        # Extract date from filename or data
-        if 'datetime' not in df.columns and 'timestamp' in df.columns:
-            # Convert timestamp to datetime
-            try:
-                df['timestamp'] = df['timestamp'].astype('int64')
-                df['datetime'] = df['timestamp'].astype('datetime64[s]')
-            except:
-                # String timestamps
-                df['datetime'] = cudf.to_datetime(df['timestamp'])
-        
-        # Add date column for partitioning
-        if 'date' not in df.columns:
-            df['date'] = df['datetime'].dt.strftime('%Y-%m-%d')
-        
-        # Write with partitioning
-        manager.write_partitioned(df, partition_cols=partition_cols)
-        
-        print(f"   ✓ Wrote {len(df):,} rows")
+    pending = None
+    touched = set()
+    # One writer thread, at most one write in flight: the next chunk is
+    # read and parsed while the previous one is copied out and written
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        for csv_file in csv_files:
+            print(f"\n📂 Converting {csv_file.name}...")
+            
+            file_rows = 0
+            for df in _read_csv_chunks(csv_file, chunk_size, columns, partition_cols):
+                file_rows += len(df)
+                
+                # Partition keys repeat a handful of values: as categories the
+                # writer groups on integer codes instead of hashing strings
+                # (they only name directories, so file dtypes are unaffected)
+                for col in partition_cols:
+                    if df[col].dtype == 'object':
+                        df[col] = df[col].astype('category')
+                
+                # Remember which partition directories this chunk lands in
+                keys = df[partition_cols].drop_duplicates().to_pandas()
+                for values in keys.itertuples(index=False):
+                    touched.add(os.path.join(*(f"{col}={val}" for col, val in zip(partition_cols, values))))
+                
+                if pending is not None:
+                    pending.result()
+                pending = writer.submit(manager.write_partitioned, df, partition_cols)
+                
+                # Dropped here; the writer releases the chunk when done and
+                # its blocks go back to the allocator pool
+                del df
+            
+            total_rows += file_rows
+            print(f"   ✓ Converted {file_rows:,} rows")
         
-        # Free GPU memory
-        del df
-        import cupy as cp
-        cp._default_memory_pool.free_all_blocks()
+        if pending is not None:
+            pending.result()
+    
+    # One file per partition instead of one per chunk (only the partitions
+    # this run wrote to)
+    for rel_dir in sorted(touched):
+        manager._compact_dir(manager.base_dir / rel_dir)
     
     print(f"\n✅ Converted {len(csv_files)} files, {total_rows:,} total rows")
     